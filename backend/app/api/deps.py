@@ -1,14 +1,16 @@
 
-from typing import Generator
+from typing import Generator, Optional
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.tokens import token_service
+from app.db.session import SessionLocal, read_router
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token", auto_error=False)
 
 def get_db() -> Generator:
     try:
@@ -19,7 +21,7 @@ def get_db() -> Generator:
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = token_service.decode(token)
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -29,3 +31,37 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         return user
     except JWTError:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
+
+def optional_user_id(db: Session, token: Optional[str]) -> Optional[int]:
+    """Id of the token's user, or None for a missing, invalid or expired token (never raises)."""
+    if token is None:
+        return None
+    try:
+        email = token_service.decode(token).get("sub")
+    except JWTError:
+        return None
+    if email is None:
+        return None
+    return db.query(User.id).filter(User.email == email).scalar()
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    admins = {email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()}
+    if current_user.email.lower() not in admins:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+def get_read_db() -> Generator:
+    """Session for anonymous read-only endpoints; served by a replica when configured."""
+    try:
+        db = read_router.session()
+        yield db
+    finally:
+        db.close()
+
+def get_user_read_db(current_user: User = Depends(get_current_user)) -> Generator:
+    """Read-only session for a user's own data; stays on the primary right after they write."""
+    try:
+        db = read_router.session(current_user.id)
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,100 @@
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.jobs import job_queue
+from app.db.session import read_router
+from app.models.question_bank import QuestionBank
+from app.models.user import User
+from app.schemas.question_bank import QuestionBankResponse
+from app.utils.question_banks import STAGING, activate_bank
+from app.utils.export import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    export_chunks,
+    export_filename,
+    export_watermark,
+    parquet_available
+)
+
+router = APIRouter()
+
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: str,
+    fmt: str = Query("csv", alias="format"),
+    since_id: Optional[int] = Query(None, description="Only rows with a greater id (previous watermark)"),
+    since: Optional[datetime] = Query(None, description="Only results created at or after this time"),
+    current_admin: User = Depends(deps.get_current_admin)
+):
+    """
+    Stream `results` or `questions` as gzip CSV or Parquet.
+    The X-Export-Watermark header carries the last id included; pass it back as since_id.
+    """
+    if dataset not in EXPORT_COLUMNS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset '{dataset}'")
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of {', '.join(EXPORT_FORMATS)}")
+    if since is not None and dataset != "results":
+        raise HTTPException(status_code=400, detail="'since' only applies to the results dataset")
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires the 'pyarrow' package")
+
+    # The stream outlives the request handler, so it owns its session
+    db = read_router.session()
+    try:
+        # The lag-safe watermark can trail a recent since_id; never hand back a lower one
+        watermark = max(export_watermark(db, dataset) or 0, since_id or 0)
+    except Exception:
+        db.close()
+        raise
+
+    def stream():
+        try:
+            yield from export_chunks(db, dataset, fmt, watermark, since_id=since_id, since=since)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/vnd.apache.parquet" if fmt == "parquet" else "application/gzip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(dataset, fmt)}"',
+            "X-Export-Watermark": str(watermark),
+        },
+    )
+
+@router.get("/jobs")
+def get_job_metrics(
+    current_admin: User = Depends(deps.get_current_admin),
+    db: Session = Depends(deps.get_db)
+):
+    """Background job queue depth, throughput counters and dead-letter count for this process."""
+    return job_queue.metrics(db)
+
+@router.get("/banks", response_model=List[QuestionBankResponse])
+def list_question_banks(
+    current_admin: User = Depends(deps.get_current_admin),
+    db: Session = Depends(deps.get_db)
+):
+    """Question bank versions, newest first."""
+    return db.query(QuestionBank).order_by(QuestionBank.id.desc()).all()
+
+@router.post("/banks/{bank_id}/activate", response_model=QuestionBankResponse)
+def activate_question_bank(
+    bank_id: int,
+    current_admin: User = Depends(deps.get_current_admin),
+    db: Session = Depends(deps.get_db)
+):
+    """Switch new reads to bank_id, e.g. to roll back to a retired version."""
+    bank = db.query(QuestionBank).filter(QuestionBank.id == bank_id).first()
+    if not bank:
+        raise HTTPException(status_code=404, detail="Question bank not found")
+    if bank.status == STAGING:
+        raise HTTPException(status_code=409, detail="Question bank is still loading")
+    return activate_bank(db, bank)
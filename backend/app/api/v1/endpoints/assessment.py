@@ -1,73 +1,94 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List
+from typing import List, Optional
 
 from app.api import deps
+from app.core.cache_bus import LocalCache, cache_bus
+from app.db.session import read_router
 from app.models.mcq import MCQ
 from app.models.result import UserResult
-from app.models.profile import UserProfile
 from app.models.user import User
+from app.models.review import ReviewItem
 from app.schemas.mcq import SubjectCount, MCQ as MCQSchema
 from app.schemas.assessment import (
     AssessmentSubmission,
     AssessmentResultResponse,
     QuestionDetailResponse
 )
+from app.schemas.review import ReviewSubmission, ReviewResult
+from app.utils.question_banks import active_bank_id
+from app.utils.questions import sample_questions, questions_by_ids, answer_keys, grade_answers
+from app.utils.results import record_result
 from app.utils.seeding import seed_mcqs_from_csv
+from app.utils.seen_questions import seen_for_subject
+from app.utils.spaced_repetition import update_review_schedule
+from app.utils.serialization import ORJSONResponse, mcq_rows_to_dicts
 
 router = APIRouter()
 
-@router.get("/overview", response_model=List[SubjectCount])
-def get_assessment_overview(db: Session = Depends(deps.get_db)):
+# Cleared when the question bank is reseeded (bus key "questions")
+overview_cache = LocalCache(cache_bus, "questions")
+
+def load_overview(db: Session) -> list:
     results = db.query(MCQ.subject, MCQ.difficulty_level, func.count(MCQ.id).label('count'))\
+        .filter(MCQ.bank_id == active_bank_id(db))\
         .group_by(MCQ.subject, MCQ.difficulty_level).all()
     
     subject_map = {}
     
     for subj_id, diff, count in results:
         if subj_id not in subject_map:
-            subject_map[subj_id] = SubjectCount(
-                subject=subj_id, 
-                count=0, 
-                difficulty_counts={"Low": 0, "Medium": 0, "Hard": 0}
-            )
+            subject_map[subj_id] = {
+                "subject": subj_id,
+                "count": 0,
+                "difficulty_counts": {"Low": 0, "Medium": 0, "Hard": 0}
+            }
         
         diff_label = "Low" if diff == 1 else "Medium" if diff == 2 else "Hard"
-        subject_map[subj_id].difficulty_counts[diff_label] = count
-        subject_map[subj_id].count += count
+        subject_map[subj_id]["difficulty_counts"][diff_label] = count
+        subject_map[subj_id]["count"] += count
         
     return list(subject_map.values())
 
+@router.get("/overview", response_model=List[SubjectCount])
+def get_assessment_overview(db: Session = Depends(deps.get_read_db)):
+    return ORJSONResponse(overview_cache.get_or_load("overview", lambda: load_overview(db)))
+
 @router.get("/questions", response_model=List[MCQSchema])
 def get_questions(
     subject: str = Query(..., alias="subject"),
     difficulty: str = Query("Medium", alias="diff"),
     limit: int = Query(25, alias="count"),
-    db: Session = Depends(deps.get_db)
+    topic: Optional[str] = Query(None, description="Chapter within the subject"),
+    fresh: bool = Query(False, description="Prefer questions the signed-in user has not seen recently"),
+    token: Optional[str] = Depends(deps.optional_oauth2_scheme),
+    db: Session = Depends(deps.get_read_db)
 ):
-    query = db.query(MCQ).filter(MCQ.subject.ilike(subject))
-    
-    if difficulty.lower() != "mix":
-        level_map = {"low": 1, "medium": 2, "hard": 3}
-        level = level_map.get(difficulty.lower())
-        if level:
-            query = query.filter(MCQ.difficulty_level == level)
-            
-    # Note: func.random() can be slow on very large datasets but is fine for this scale.
-    questions = query.order_by(func.random()).limit(limit).all()
-    return questions
+    seen = None
+    # The endpoint is public: the token is only read for fresh, and a bad one means anonymous sampling
+    user_id = deps.optional_user_id(db, token) if fresh else None
+    if user_id is not None:
+        seen = seen_for_subject(db, user_id, subject)
+    rows = sample_questions(db, subject, difficulty, limit, topic=topic, seen=seen)
+    # Plain column rows are encoded directly; response_model stays for the OpenAPI schema.
+    return ORJSONResponse(mcq_rows_to_dicts(rows))
 
 @router.post("/seed-csv", status_code=status.HTTP_201_CREATED)
-def seed_from_csv(force: bool = False, db: Session = Depends(deps.get_db)):
+def seed_from_csv(
+    force: bool = False,
+    current_admin: User = Depends(deps.get_current_admin),
+    db: Session = Depends(deps.get_db)
+):
     return seed_mcqs_from_csv(db, force)
 
 @router.get("/result/{result_id}", response_model=AssessmentResultResponse)
 def get_assessment_result(
     result_id: int,
     current_user: User = Depends(deps.get_current_user),
-    db: Session = Depends(deps.get_db)
+    db: Session = Depends(deps.get_user_read_db)
 ):
     result = db.query(UserResult).filter(
         UserResult.id == result_id, 
@@ -114,29 +135,49 @@ def submit_assessment(
     current_user: User = Depends(deps.get_current_user),
     db: Session = Depends(deps.get_db)
 ):
-    accuracy = 0
-    if submission.total_questions > 0:
-        accuracy = (submission.score / submission.total_questions) * 100
-        
-    result = UserResult(
-        user_id=current_user.id,
+    # current_user expires with the commit below; keep the id rather than reload the row
+    user_id = current_user.id
+    record_result(
+        db,
+        user_id=user_id,
         subject=submission.subject,
         score=submission.score,
         total_questions=submission.total_questions,
-        accuracy=accuracy,
         answers=submission.answers
     )
-    db.add(result)
-    
-    # Update profile stats
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-    if profile:
-        profile.tests_taken += 1
-        db.flush()
-        # Calculate new average accuracy efficiently
-        # Using a direct SQL aggregation is better than fetching all user results
-        avg = db.query(func.avg(UserResult.accuracy)).filter(UserResult.user_id == current_user.id).scalar()
-        profile.avg_accuracy = round(avg, 2) if avg is not None else round(accuracy, 2)
-        
-    db.commit()
+    read_router.record_write(user_id)
     return {"message": "Submitted successfully"}
+
+@router.get("/review", response_model=List[MCQSchema])
+def get_review_questions(
+    limit: int = Query(20, alias="count", ge=1, le=100),
+    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_user_read_db)
+):
+    """Previously missed questions that are due, most overdue first."""
+    due_ids = [mcq_id for (mcq_id,) in db.query(ReviewItem.mcq_id).filter(
+        ReviewItem.user_id == current_user.id,
+        ReviewItem.due_at <= datetime.now(timezone.utc)
+    ).order_by(ReviewItem.due_at).limit(limit)]
+    return ORJSONResponse(mcq_rows_to_dicts(questions_by_ids(db, due_ids)))
+
+@router.post("/review", response_model=ReviewResult)
+def submit_review(
+    submission: ReviewSubmission,
+    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_db)
+):
+    graded = grade_answers(answer_keys(db, list(submission.answers)), submission.answers)
+    update_review_schedule(db, current_user.id, graded)
+    db.commit()
+    read_router.record_write(current_user.id)
+
+    due_remaining = db.query(func.count(ReviewItem.id)).filter(
+        ReviewItem.user_id == current_user.id,
+        ReviewItem.due_at <= datetime.now(timezone.utc)
+    ).scalar()
+    return ReviewResult(
+        reviewed=len(graded),
+        correct=sum(graded.values()),
+        due_remaining=due_remaining
+    )
@@ -0,0 +1,146 @@
+
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.core.kvstore import store
+from app.db.session import read_router
+from app.models.user import User
+from app.schemas.exam_session import (
+    ExamSessionStart,
+    AnswerPatch,
+    ExamSessionResponse,
+    AutosaveResponse,
+    ExamSessionResult
+)
+from app.utils.questions import sample_questions, questions_by_ids, answer_keys, grade_answers
+from app.utils.results import record_result
+from app.utils.seen_questions import seen_for_subject
+from app.utils.serialization import ORJSONResponse, mcq_rows_to_dicts
+
+router = APIRouter()
+
+# Each session is two hashes: fixed metadata, and the answers map that autosave patches.
+# Keeping answers separate makes an autosave a single HSET of the changed fields.
+def _meta_key(session_id: str) -> str:
+    return f"exam:{session_id}"
+
+def _answers_key(session_id: str) -> str:
+    return f"exam:{session_id}:answers"
+
+def _load_session(session_id: str, user: User) -> Tuple[Dict[str, str], List[int]]:
+    meta = store.hgetall(_meta_key(session_id))
+    if not meta or meta.get("user_id") != str(user.id):
+        raise HTTPException(status_code=404, detail="Exam session not found or expired")
+    question_ids = [int(qid) for qid in meta["question_ids"].split(",") if qid]
+    return meta, question_ids
+
+def _session_response(session_id: str, subject: str, rows: List, answers: Dict[str, str]) -> ORJSONResponse:
+    return ORJSONResponse({
+        "session_id": session_id,
+        "subject": subject,
+        "expires_in": max(store.ttl(_meta_key(session_id)), 0),
+        "questions": mcq_rows_to_dicts(rows),
+        "answers": answers,
+    })
+
+@router.post("", response_model=ExamSessionResponse, status_code=status.HTTP_201_CREATED)
+def start_exam_session(
+    session_in: ExamSessionStart,
+    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_read_db)
+):
+    seen = seen_for_subject(db, current_user.id, session_in.subject) if session_in.fresh else None
+    rows = sample_questions(db, session_in.subject, session_in.difficulty, session_in.count,
+                            topic=session_in.topic, seen=seen)
+    if not rows:
+        raise HTTPException(status_code=404, detail="No questions available for this selection")
+
+    session_id = uuid.uuid4().hex
+    store.hset(_meta_key(session_id), {
+        "user_id": current_user.id,
+        "subject": session_in.subject,
+        "question_ids": ",".join(str(row[0]) for row in rows),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+    }, ttl=settings.EXAM_SESSION_TTL_SECONDS)
+
+    response = _session_response(session_id, session_in.subject, rows, {})
+    response.status_code = status.HTTP_201_CREATED
+    return response
+
+@router.get("/{session_id}", response_model=ExamSessionResponse)
+def resume_exam_session(
+    session_id: str,
+    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_read_db)
+):
+    meta, question_ids = _load_session(session_id, current_user)
+    answers = store.hgetall(_answers_key(session_id))
+    return _session_response(session_id, meta["subject"], questions_by_ids(db, question_ids), answers)
+
+@router.patch("/{session_id}/answers", response_model=AutosaveResponse)
+def autosave_answers(
+    session_id: str,
+    patch: AnswerPatch,
+    current_user: User = Depends(deps.get_current_user)
+):
+    # The delta is merged without rewriting the session; only its own questions are kept
+    _, question_ids = _load_session(session_id, current_user)
+    unknown = sorted(set(patch.answers) - set(question_ids))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Questions not in this exam session: {unknown}")
+
+    ttl = settings.EXAM_SESSION_TTL_SECONDS
+    if patch.answers:
+        store.hset(_answers_key(session_id), patch.answers, ttl=ttl)
+    else:
+        store.expire(_answers_key(session_id), ttl)
+    store.expire(_meta_key(session_id), ttl)
+    return {"saved": len(patch.answers), "expires_in": ttl}
+
+@router.post("/{session_id}/finish", response_model=ExamSessionResult)
+def finish_exam_session(
+    session_id: str,
+    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_db)
+):
+    meta, question_ids = _load_session(session_id, current_user)
+    saved = store.hgetall(_answers_key(session_id))
+    remaining = store.ttl(_meta_key(session_id))
+
+    # Claim the session: DEL is atomic, so of two concurrent finishes only one removes the key
+    if not store.delete(_meta_key(session_id)):
+        raise HTTPException(status_code=409, detail="Exam session is already being finished")
+
+    # current_user expires with record_result's commit; keep the id rather than reload the row
+    user_id = current_user.id
+    try:
+        # Grade on the server; answers for questions outside the session are ignored
+        answers = {qid: saved[str(qid)] for qid in question_ids if str(qid) in saved}
+        score = sum(grade_answers(answer_keys(db, question_ids), answers).values())
+        result = record_result(
+            db,
+            user_id=user_id,
+            subject=meta["subject"],
+            score=score,
+            total_questions=len(question_ids),
+            answers=answers
+        )
+    except Exception:
+        # Nothing was recorded; give the session back, with the time it had left, so the finish can be retried
+        store.hset(_meta_key(session_id), meta, ttl=None if remaining == -1 else max(remaining, 1))
+        raise
+    store.delete(_answers_key(session_id))
+    read_router.record_write(user_id)
+
+    return ExamSessionResult(
+        result_id=result.id,
+        score=result.score,
+        total_questions=result.total_questions,
+        accuracy=result.accuracy
+    )
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.lifecycle import lifecycle
+
+router = APIRouter()
+
+@router.get("/live")
+def liveness():
+    """The process is up; restart it only if this stops answering."""
+    return {"status": "ok"}
+
+@router.get("/ready")
+def readiness():
+    """503 until caches are warm and again while draining for shutdown."""
+    status_code = 200 if lifecycle.ready else 503
+    return JSONResponse(lifecycle.status(), status_code=status_code)
@@ -2,20 +2,30 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.api import deps
+from app.core.cache_bus import LocalCache, cache_bus
 from app.models.user import User
 from app.models.mcq import MCQ
+from app.utils.question_banks import active_bank_id
 
 router = APIRouter()
 
-@router.get("/stats")
-def get_home_stats(db: Session = Depends(deps.get_db)):
+# Cleared on reseeding and, coalesced, after signups (bus key "stats"; see app/utils/home_stats.py)
+stats_cache = LocalCache(cache_bus, "stats")
+
+def load_home_stats(db: Session) -> dict:
     users_count = db.query(User).count()
-    questions_count = db.query(MCQ).count()
+    # Only the active bank counts; retired snapshots are kept for old results
+    in_bank = MCQ.bank_id == active_bank_id(db)
+    questions_count = db.query(MCQ).filter(in_bank).count()
     # Distinct subjects
-    subjects_count = db.query(MCQ.subject).distinct().count()
+    subjects_count = db.query(MCQ.subject).filter(in_bank).distinct().count()
     
     return {
         "users": users_count,
         "questions": questions_count,
         "subjects": subjects_count
     }
+
+@router.get("/stats")
+def get_home_stats(db: Session = Depends(deps.get_db)):
+    return stats_cache.get_or_load("home", lambda: load_home_stats(db))
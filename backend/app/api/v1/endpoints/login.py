@@ -1,12 +1,14 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from jose import JWTError
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.models.user import User
 from app.schemas.user import UserLogin
-from app.schemas.token import Token
-from app.core.security import verify_password, create_access_token
+from app.schemas.token import Token, RefreshRequest
+from app.core.security import verify_password, create_access_token, create_refresh_token
+from app.core.tokens import token_service
 
 router = APIRouter()
 
@@ -29,4 +31,35 @@ def login(user_in: UserLogin, db: Session = Depends(deps.get_db)):
         )
 
     access_token = create_access_token(subject=user.email)
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = create_refresh_token(subject=user.email)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+def _verify_refresh_token(db: Session, refresh_token: str) -> dict:
+    try:
+        claims = token_service.decode(refresh_token, token_type="refresh")
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    if token_service.is_revoked(db, claims["jti"]):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked")
+    return claims
+
+@router.post("/refresh", response_model=Token)
+def refresh(body: RefreshRequest, db: Session = Depends(deps.get_db)):
+    claims = _verify_refresh_token(db, body.refresh_token)
+    user = db.query(User).filter(User.email == claims["sub"]).first()
+    if not user or not user.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    # Rotate: the old refresh token is single-use. Losing the revoke race means a replay.
+    if not token_service.revoke(db, claims):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked")
+
+    access_token = create_access_token(subject=user.email)
+    refresh_token = create_refresh_token(subject=user.email)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(body: RefreshRequest, db: Session = Depends(deps.get_db)):
+    claims = _verify_refresh_token(db, body.refresh_token)
+    token_service.revoke(db, claims)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -3,19 +3,28 @@ import json
 import shutil
 import uuid
 from pathlib import Path
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.cache_bus import LocalCache, cache_bus
 from app.models.user import User
 from app.models.profile import UserProfile
 from app.models.result import UserResult
+from app.db.partitioning import add_months, month_start
 from app.schemas.profile import UserProfileUpdate, UserProfileResponse, UserHistoryItem
+from app.schemas.progress import ProgressResponse
+from app.utils.progress import BUCKETS, get_progress
+from app.utils.serialization import ORJSONResponse, HISTORY_COLUMNS, history_rows_to_dicts
 
 router = APIRouter()
 
+# Profile responses by str(user_id); bus key "profile:<user_id>" drops one entry
+profile_cache = LocalCache(cache_bus, "profile", maxsize=10000)
+
 def get_profile_response(profile: UserProfile, user: User) -> UserProfileResponse:
     try:
         subjects = json.loads(profile.subjects_interested) if profile.subjects_interested else []
@@ -50,8 +59,10 @@ def get_my_profile(
     current_user: User = Depends(deps.get_current_user), 
     db: Session = Depends(deps.get_db)
 ):
-    profile = ensure_profile_exists(db, current_user.id)
-    return get_profile_response(profile, current_user)
+    return profile_cache.get_or_load(
+        str(current_user.id),
+        lambda: get_profile_response(ensure_profile_exists(db, current_user.id), current_user)
+    )
 
 @router.post("/avatar", response_model=UserProfileResponse)
 def upload_avatar(
@@ -76,6 +87,7 @@ def upload_avatar(
     # Update profile
     profile.avatar_url = f"/static/uploads/{file_name}"
     db.add(profile)
+    cache_bus.publish(db, profile_cache.key(current_user.id))
     db.commit()
     db.refresh(profile)
     
@@ -103,6 +115,7 @@ def update_my_profile(
         db.add(current_user)
 
     db.add(profile)
+    cache_bus.publish(db, profile_cache.key(current_user.id))
     db.commit()
     db.refresh(profile)
     db.refresh(current_user)
@@ -111,11 +124,26 @@ def update_my_profile(
 
 @router.get("/history", response_model=List[UserHistoryItem])
 def get_user_history(
+    months: Optional[int] = Query(None, ge=1, description="Only include the last N calendar months"),
     current_user: User = Depends(deps.get_current_user),
-    db: Session = Depends(deps.get_db)
+    db: Session = Depends(deps.get_user_read_db)
+):
+    query = db.query(*HISTORY_COLUMNS).filter(UserResult.user_id == current_user.id)
+    if months:
+        # A created_at bound lets PostgreSQL prune to the matching monthly partitions
+        since = add_months(month_start(datetime.now(timezone.utc)), 1 - months)
+        query = query.filter(UserResult.created_at >= since)
+    rows = query.order_by(UserResult.created_at.desc()).all()
+    return ORJSONResponse(history_rows_to_dicts(rows))
+
+@router.get("/progress", response_model=ProgressResponse)
+def get_user_progress(
+    days: int = Query(90, ge=1, le=730),
+    bucket: str = Query("week", description="day, week or month"),
+    current_user: User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_user_read_db)
 ):
-    history = db.query(UserResult)\
-        .filter(UserResult.user_id == current_user.id)\
-        .order_by(UserResult.created_at.desc())\
-        .all()
-    return history
+    """Accuracy trends, streaks and weak topics, served from rollups kept current by each submit."""
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {', '.join(BUCKETS)}")
+    return ORJSONResponse(get_progress(db, current_user.id, days, bucket))
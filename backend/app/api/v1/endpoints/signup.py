@@ -6,6 +6,7 @@ from app.models.user import User
 from app.models.profile import UserProfile
 from app.schemas.user import UserCreate, UserResponse
 from app.core.security import get_password_hash
+from app.utils.home_stats import mark_stats_changed
 
 router = APIRouter()
 
@@ -34,5 +35,6 @@ def signup(user_in: UserCreate, db: Session = Depends(deps.get_db)):
     profile = UserProfile(user_id=user.id)
     db.add(profile)
     db.commit()
+    mark_stats_changed()
     
     return user
@@ -0,0 +1,243 @@
+"""
+Cross-process cache invalidation.
+
+Process-local caches (subject ids, answer keys, home stats, profiles) subscribe to
+bus keys. A write calls publish(db, key) inside its transaction, which bumps the
+key's row in `cache_versions`. Once that transaction commits:
+- the publishing process evicts straight away (after_commit hook);
+- on PostgreSQL, pg_notify (sent on commit) reaches every listening worker;
+- every worker also polls recently bumped rows, which is the only channel on SQLite
+  and the catch-up path after a dropped LISTEN connection.
+Versions only move forward, so a key seen on both channels is applied once.
+"""
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.cache_version import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[str, int], None]
+
+CHANNEL = "cache_invalidation"
+# Polls re-read rows bumped this long before the previous poll, covering commit
+# latency and clock skew between writers
+LOOKBACK_SECONDS = 10
+# With LISTEN/NOTIFY the poll is only a safety net
+NOTIFY_POLL_SECONDS = 60
+
+_PENDING = "cache_bus_pending"
+
+
+class CacheBus:
+    def __init__(self, session_factory, engine: Engine, poll_interval: float):
+        self._session_factory = session_factory
+        self._engine = engine
+        self._poll_interval = poll_interval
+        self._use_notify = engine.dialect.name == "postgresql"
+        self._versions: Dict[str, int] = {}
+        self._exact: Dict[str, List[Callback]] = defaultdict(list)
+        self._families: Dict[str, List[Callback]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._polled_at: Optional[datetime] = None
+
+    def subscribe(self, key: str, callback: Callback) -> None:
+        """
+        Call callback(key, version) whenever a newer version of key is published.
+        A key ending in ':' subscribes to the whole family ("profile:" -> "profile:42").
+        """
+        target = self._families if key.endswith(":") else self._exact
+        target[key].append(callback)
+
+    def version(self, key: str) -> int:
+        return self._versions.get(key, 0)
+
+    # Publishing
+
+    def publish(self, db: Session, key: str) -> int:
+        """Bump key inside db's transaction (caller commits); subscribers fire once it commits."""
+        now = datetime.now(timezone.utc)
+        bump = {CacheVersion.version: CacheVersion.version + 1, CacheVersion.updated_at: now}
+        if not db.query(CacheVersion).filter(CacheVersion.key == key).update(bump, synchronize_session=False):
+            try:
+                with db.begin_nested():
+                    db.add(CacheVersion(key=key, version=1, updated_at=now))
+            except IntegrityError:
+                # Another writer created the row first
+                db.query(CacheVersion).filter(CacheVersion.key == key).update(bump, synchronize_session=False)
+        version = db.query(CacheVersion.version).filter(CacheVersion.key == key).scalar()
+        if self._use_notify:
+            # NOTIFY is transactional: listeners only hear it if the commit succeeds
+            db.execute(text("SELECT pg_notify(:channel, :payload)"),
+                       {"channel": CHANNEL, "payload": f"{version}:{key}"})
+        db.info.setdefault(_PENDING, {})[key] = version
+        return version
+
+    def _apply(self, key: str, version: int) -> None:
+        with self._lock:
+            if version <= self._versions.get(key, 0):
+                return
+            self._versions[key] = version
+        callbacks = list(self._exact.get(key, ()))
+        if ":" in key:
+            callbacks += self._families.get(key.split(":", 1)[0] + ":", ())
+        for callback in callbacks:
+            try:
+                callback(key, version)
+            except Exception as e:
+                logger.warning(f"Cache invalidation callback for {key} failed: {e}")
+
+    # Receiving
+
+    def start(self) -> None:
+        with self._lock:
+            # Threads do not survive a fork, so a preloaded app starts one again per worker
+            if self._thread is not None and self._thread.is_alive():
+                return
+            target = self._listen if self._use_notify else self._poll_forever
+            self._thread = threading.Thread(target=target, name="cache-bus", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def poll(self) -> None:
+        """Apply every key bumped since the previous poll (minus the lookback window)."""
+        started = datetime.now(timezone.utc)
+        since = (self._polled_at or started) - timedelta(seconds=LOOKBACK_SECONDS)
+        db = self._session_factory()
+        try:
+            rows = db.query(CacheVersion.key, CacheVersion.version)\
+                .filter(CacheVersion.updated_at >= since).all()
+        finally:
+            db.close()
+        self._polled_at = started
+        for key, version in rows:
+            self._apply(key, version)
+
+    def _poll_forever(self) -> None:
+        while not self._stopping.wait(self._poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Cache bus poll failed: {e}")
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._listen_once()
+            except Exception as e:
+                logger.warning(f"Cache bus listener lost its connection, reconnecting: {e}")
+                self._stopping.wait(self._poll_interval)
+
+    def _listen_once(self) -> None:
+        # A dedicated connection: LISTEN state must never go back to the pool
+        raw = self._engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            # Anything published while we were not listening
+            self.poll()
+            next_poll = time.monotonic() + NOTIFY_POLL_SECONDS
+            while not self._stopping.is_set():
+                if select.select([conn], [], [], self._poll_interval)[0]:
+                    conn.poll()
+                    while conn.notifies:
+                        version, key = conn.notifies.pop(0).payload.split(":", 1)
+                        self._apply(key, int(version))
+                if time.monotonic() >= next_poll:
+                    self.poll()
+                    next_poll = time.monotonic() + NOTIFY_POLL_SECONDS
+        finally:
+            raw.invalidate()
+
+
+class LocalCache:
+    """
+    Process-local cache kept coherent through the bus. Publishing `namespace` clears
+    it; publishing `namespace:<name>` drops only the entry stored under str name.
+    Values loaded while an eviction ran are returned but not kept.
+    """
+
+    def __init__(self, bus: CacheBus, namespace: str, maxsize: Optional[int] = None):
+        self._bus = bus
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Any] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        bus.subscribe(namespace, self._evict)
+        bus.subscribe(namespace + ":", self._evict)
+
+    def key(self, name: Hashable) -> str:
+        """Bus key that evicts a single entry."""
+        return f"{self.namespace}:{name}"
+
+    def _evict(self, key: str, version: int) -> None:
+        with self._lock:
+            self._generation += 1
+            if key == self.namespace:
+                self._data.clear()
+            else:
+                self._data.pop(key[len(self.namespace) + 1:], None)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get_many(self, names: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        data = self._data
+        return {name: data[name] for name in names if name in data}
+
+    def set_many(self, values: Dict[Hashable, Any], generation: int) -> None:
+        """Store values loaded at generation, unless an eviction happened since."""
+        # Entries are only safe to keep while this process follows invalidations
+        self._bus.start()
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._data.update(values)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.pop(next(iter(self._data)))
+
+    def get_or_load(self, name: Hashable, loader: Callable[[], Any]) -> Any:
+        try:
+            return self._data[name]
+        except KeyError:
+            pass
+        generation = self._generation
+        value = loader()
+        self.set_many({name: value}, generation)
+        return value
+
+
+cache_bus = CacheBus(SessionLocal, engine, poll_interval=settings.CACHE_POLL_SECONDS)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        for key, version in pending.items():
+            cache_bus._apply(key, version)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING, None)
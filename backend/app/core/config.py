@@ -8,10 +8,58 @@ class Settings(BaseSettings):
     # These values must be provided via environment variables or .env.local file
     DATABASE_URL: str
     SECRET_KEY: str
+
+    # Optional read replicas as a comma-separated list of URLs.
+    # When empty, every query goes to DATABASE_URL.
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_HEALTH_CHECK_SECONDS: int = 30
+    # After a user writes, their reads stay on the primary for this long (read-your-writes).
+    # Pins are kept in REDIS_URL's store, so they hold across worker processes.
+    REPLICA_STICKY_SECONDS: int = 10
     
+    # Attempts older than this many months have their answer blobs compacted into rollups
+    RESULT_RETENTION_MONTHS: int = 12
+
+    # In-progress exam sessions live in Redis when REDIS_URL is set, otherwise in process memory
+    REDIS_URL: str | None = None
+    EXAM_SESSION_TTL_SECONDS: int = 3 * 60 * 60
+
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+
+    # Signing keys for rotation as "kid:secret" pairs, comma-separated. New tokens are
+    # signed with ACTIVE_KEY_ID; tokens signed with any listed key still verify.
+    # When empty, SECRET_KEY is the only key. Old tokens without a key id verify only
+    # while SECRET_KEY is one of these secrets.
+    SIGNING_KEYS: str = ""
+    ACTIVE_KEY_ID: str | None = None
+    # Verified access-token claims kept in memory until they expire
+    TOKEN_CACHE_SIZE: int = 10000
+    # How often each process reloads revoked refresh tokens from the database
+    REVOCATION_SYNC_SECONDS: int = 30
     
+    # In-process background jobs (post-submit stats etc.) with a database fallback
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_SIZE: int = 1000
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_POLL_SECONDS: float = 5
+
+    # Seconds between cache_versions polls; on PostgreSQL LISTEN/NOTIFY delivers sooner
+    CACHE_POLL_SECONDS: float = 1
+
+    # Server processes for serve.py (defaults to 2 x cores + 1)
+    WEB_CONCURRENCY: int | None = None
+    # After SIGTERM, keep serving this long while /health/ready reports 503, so the load
+    # balancer stops routing before the server closes. 0 (development, --reload) skips it;
+    # serve.py defaults it to 10.
+    SHUTDOWN_DELAY_SECONDS: int = 0
+    # On shutdown, how long queued jobs get to finish before they are persisted
+    SHUTDOWN_DRAIN_SECONDS: int = 20
+
+    # Comma-separated emails allowed to use the /admin endpoints (exports, ops)
+    ADMIN_EMAILS: str = ""
+
     # Email settings
     MAIL_USERNAME: str | None = None
     MAIL_PASSWORD: str | None = None
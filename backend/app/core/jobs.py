@@ -0,0 +1,281 @@
+"""
+Lightweight background jobs for work that should not hold up a response.
+
+Jobs go to in-memory queues, one per JOB_WORKERS thread. Jobs enqueued with the same
+key (e.g. one user's results) always land on the same worker, so they run in order and
+never race each other for that user's rows. The `background_jobs` table is the durable
+fallback:
+- the queue is full or shutting down -> the job is stored as `pending`;
+- a job fails -> it is stored with an exponential `run_after` backoff and retried;
+- it fails JOB_MAX_ATTEMPTS times -> it stays in the table as `dead` (dead letter).
+A poller claims due rows with a conditional UPDATE, so several processes can share
+the table; a claim is a lease, and rows whose lease ran out are picked up again.
+The poller also runs `periodic` maintenance tasks, in every process.
+
+Delivery is at-least-once: a lease can run out while a slow handler is still busy,
+and a process can die after the work is done. A stored job's row is deleted in the
+handler's own transaction, but handlers must still be idempotent (e.g. mark the row
+they process). Key ordering holds within one process; jobs for the same key in two
+processes can still collide, and the loser is retried like any other failure.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Session, dict], None]
+
+LEASE_SECONDS = 300
+MAX_BACKOFF_SECONDS = 300
+
+
+class JobQueue:
+    def __init__(self, session_factory, workers: int, maxsize: int, max_attempts: int, poll_interval: float):
+        self._session_factory = session_factory
+        self._workers = workers
+        self._max_attempts = max_attempts
+        self._poll_interval = poll_interval
+        self._handlers: Dict[str, Handler] = {}
+        self._queues: List["queue.Queue"] = [
+            queue.Queue(maxsize=max(maxsize // workers, 1)) for _ in range(workers)
+        ]
+        self._threads = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._running = 0
+        # fn -> (interval seconds, monotonic time of the next run)
+        self._periodic: Dict[Callable[[], None], List[float]] = {}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] += 1
+
+    def handler(self, name: str):
+        """Register the decorated function as the handler for jobs called name."""
+        def register(fn: Handler) -> Handler:
+            self._handlers[name] = fn
+            return fn
+        return register
+
+    def periodic(self, seconds: float):
+        """Run the decorated function (no arguments) from the poller every seconds; must be idempotent."""
+        def register(fn: Callable[[], None]) -> Callable[[], None]:
+            self._periodic[fn] = [seconds, time.monotonic() + seconds]
+            return fn
+        return register
+
+    # Lifecycle
+
+    def start(self) -> None:
+        with self._lock:
+            # Threads do not survive a fork, so a preloaded app starts them again per worker
+            if any(t.is_alive() for t in self._threads) or self._stopping.is_set():
+                return
+            self._threads = []
+            for i in range(self._workers):
+                thread = threading.Thread(target=self._work, args=(self._queues[i],),
+                                          name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            poller = threading.Thread(target=self._poll, name="job-poller", daemon=True)
+            poller.start()
+            self._threads.append(poller)
+
+    def stop(self, timeout: float = 10) -> None:
+        """Stop taking jobs, give queued ones up to timeout to finish, persist the rest."""
+        self._stopping.set()
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=timeout)
+        for thread in self._threads:
+            remaining = (deadline - datetime.now(timezone.utc)).total_seconds()
+            thread.join(max(remaining, 0))
+        for q in self._queues:
+            while True:
+                try:
+                    name, payload, key, attempts, job_id = q.get_nowait()
+                except queue.Empty:
+                    break
+                self._store(name, payload, key, attempts, job_id, status="pending")
+
+    # Producing
+
+    def _queue_for(self, key: Optional[str]) -> "queue.Queue":
+        if key is None:
+            return min(self._queues, key=lambda q: q.qsize())
+        return self._queues[hash(key) % len(self._queues)]
+
+    def enqueue(self, name: str, payload: dict, key: Optional[str] = None) -> None:
+        """Queue a job; jobs with the same key run one after another on one worker."""
+        if name not in self._handlers:
+            raise ValueError(f"No handler registered for job '{name}'")
+        self.start()
+        self._count("enqueued")
+        if not self._stopping.is_set():
+            try:
+                self._queue_for(key).put_nowait((name, payload, key, 0, None))
+                return
+            except queue.Full:
+                pass
+        self._count("overflowed")
+        self._store(name, payload, key, 0, None, status="pending")
+
+    # Consuming
+
+    def _work(self, jobs: "queue.Queue") -> None:
+        while True:
+            try:
+                item = jobs.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            self._run(*item)
+
+    def _run(self, name: str, payload: dict, key: Optional[str], attempts: int, job_id: Optional[int]) -> None:
+        with self._lock:
+            self._running += 1
+        db = self._session_factory()
+        try:
+            self._handlers[name](db, payload)
+            if job_id is not None:
+                # Committed with the handler's writes: the job is either done and gone, or neither
+                db.query(BackgroundJob).filter(BackgroundJob.id == job_id).delete(synchronize_session=False)
+            db.commit()
+            self._count("processed")
+        except Exception as e:
+            db.rollback()
+            attempts += 1
+            self._count("failed")
+            if attempts >= self._max_attempts:
+                logger.error(f"Job {name} dead-lettered after {attempts} attempts: {e}")
+                self._count("dead_lettered")
+                self._store(name, payload, key, attempts, job_id, status="dead", error=repr(e))
+            else:
+                logger.warning(f"Job {name} failed (attempt {attempts}), retrying: {e}")
+                self._count("retried")
+                delay = min(5 * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+                self._store(name, payload, key, attempts, job_id, status="pending", error=repr(e), delay=delay)
+        finally:
+            db.close()
+            with self._lock:
+                self._running -= 1
+
+    def _store(self, name: str, payload: dict, key: Optional[str], attempts: int, job_id: Optional[int],
+               status: str, error: Optional[str] = None, delay: float = 0) -> None:
+        db = self._session_factory()
+        try:
+            run_after = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first() if job_id else None
+            if job is None:
+                job = BackgroundJob(name=name, payload=payload, key=key)
+                db.add(job)
+            job.status = status
+            job.attempts = attempts
+            job.last_error = error
+            job.run_after = run_after
+            db.commit()
+        except Exception as e:
+            logger.error(f"Could not persist job {name}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _poll(self) -> None:
+        while not self._stopping.wait(self._poll_interval):
+            try:
+                self._claim_due()
+            except Exception as e:
+                logger.warning(f"Job poller failed: {e}")
+            self._run_periodic()
+
+    def _run_periodic(self) -> None:
+        now = time.monotonic()
+        for fn, schedule in self._periodic.items():
+            interval, next_run = schedule
+            if now < next_run:
+                continue
+            schedule[1] = now + interval
+            try:
+                fn()
+            except Exception as e:
+                logger.warning(f"Periodic task {fn.__name__} failed: {e}")
+
+    def _claim_due(self) -> None:
+        if all(q.full() for q in self._queues):
+            return
+        db = self._session_factory()
+        try:
+            now = datetime.now(timezone.utc)
+            due = db.query(BackgroundJob.id, BackgroundJob.name, BackgroundJob.payload,
+                           BackgroundJob.key, BackgroundJob.attempts)\
+                .filter(
+                    or_(BackgroundJob.status == "pending", BackgroundJob.status == "running"),
+                    BackgroundJob.run_after <= now
+                ).order_by(BackgroundJob.run_after)\
+                .limit(sum(q.maxsize for q in self._queues)).all()
+            for job_id, name, payload, key, attempts in due:
+                if all(q.full() for q in self._queues):
+                    break
+                if name not in self._handlers or self._queue_for(key).full():
+                    # Another process may handle it, or this worker has room on a later poll
+                    continue
+                # Claim with a lease; only one process wins the conditional update
+                claimed = db.query(BackgroundJob).filter(
+                    BackgroundJob.id == job_id,
+                    BackgroundJob.run_after <= now,
+                    BackgroundJob.status != "dead"
+                ).update(
+                    {BackgroundJob.status: "running", BackgroundJob.run_after: now + timedelta(seconds=LEASE_SECONDS)},
+                    synchronize_session=False
+                )
+                db.commit()
+                if not claimed:
+                    continue
+                try:
+                    # Never block: one busy worker must not hold up the jobs of every other key
+                    self._queue_for(key).put_nowait((name, payload, key, attempts, job_id))
+                except queue.Full:
+                    # Filled up since the check; release the lease so the next poll retries it
+                    db.query(BackgroundJob).filter(BackgroundJob.id == job_id).update(
+                        {BackgroundJob.status: "pending", BackgroundJob.run_after: now},
+                        synchronize_session=False
+                    )
+                    db.commit()
+        finally:
+            db.close()
+
+    # Observability
+
+    def metrics(self, db: Session) -> dict:
+        durable = dict(db.query(BackgroundJob.status, func.count(BackgroundJob.id))
+                       .group_by(BackgroundJob.status).all())
+        return {
+            "queue_depth": sum(q.qsize() for q in self._queues),
+            "running": self._running,
+            "workers": self._workers,
+            "durable_pending": durable.get("pending", 0) + durable.get("running", 0),
+            "dead_letters": durable.get("dead", 0),
+            **{key: self._counters[key] for key in
+               ("enqueued", "overflowed", "processed", "failed", "retried", "dead_lettered")},
+        }
+
+
+job_queue = JobQueue(
+    SessionLocal,
+    workers=settings.JOB_WORKERS,
+    maxsize=settings.JOB_QUEUE_SIZE,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    poll_interval=settings.JOB_POLL_SECONDS,
+)
@@ -0,0 +1,121 @@
+"""
+Small key/value store for short-lived server state (e.g. in-progress exam sessions).
+
+Only the Redis hash + TTL commands the app needs are exposed, so the same code runs
+against a real Redis (REDIS_URL set, `redis` package installed) or the in-process
+MemoryStore used for local development and single-worker deployments.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+
+class MemoryStore:
+    """Thread-safe in-process store with per-key expiry. Expired keys are dropped lazily."""
+
+    SWEEP_EVERY = 1000  # writes between full expiry sweeps
+
+    def __init__(self):
+        self._data: Dict[str, Dict[str, str]] = {}
+        self._expires_at: Dict[str, float] = {}
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[Dict[str, str]]:
+        # Caller holds the lock
+        expires_at = self._expires_at.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires_at.pop(key, None)
+            return None
+        return self._data.get(key)
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, t in self._expires_at.items() if t <= now]:
+            self._data.pop(key, None)
+            self._expires_at.pop(key, None)
+
+    def hset(self, key: str, mapping: Dict[str, str], ttl: Optional[int] = None) -> None:
+        """Merge fields into the hash at key, optionally (re)setting its TTL in seconds."""
+        with self._lock:
+            current = self._get(key)
+            if current is None:
+                current = self._data[key] = {}
+            current.update({str(k): str(v) for k, v in mapping.items()})
+            if ttl is not None:
+                self._expires_at[key] = time.monotonic() + ttl
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                self._sweep()
+
+    def hget(self, key: str, field: str) -> Optional[str]:
+        with self._lock:
+            current = self._get(key)
+            return current.get(field) if current else None
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._get(key) or {})
+
+    def expire(self, key: str, ttl: int) -> None:
+        with self._lock:
+            if self._get(key) is not None:
+                self._expires_at[key] = time.monotonic() + ttl
+
+    def ttl(self, key: str) -> int:
+        """Seconds left, -1 without expiry, -2 for a missing key (Redis semantics)."""
+        with self._lock:
+            if self._get(key) is None:
+                return -2
+            expires_at = self._expires_at.get(key)
+            return -1 if expires_at is None else max(0, int(expires_at - time.monotonic()))
+
+    def delete(self, *keys: str) -> int:
+        """Remove keys; returns how many existed, so only one caller sees a key go away."""
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._get(key) is not None:
+                    removed += 1
+                self._data.pop(key, None)
+                self._expires_at.pop(key, None)
+            return removed
+
+
+class RedisStore:
+    """Same interface backed by Redis; HSET + EXPIRE go out in one round trip."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed") from e
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def hset(self, key: str, mapping: Dict[str, str], ttl: Optional[int] = None) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        pipe.hset(key, mapping={str(k): str(v) for k, v in mapping.items()})
+        if ttl is not None:
+            pipe.expire(key, ttl)
+        pipe.execute()
+
+    def hget(self, key: str, field: str) -> Optional[str]:
+        return self._client.hget(key, field)
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        return self._client.hgetall(key)
+
+    def expire(self, key: str, ttl: int) -> None:
+        self._client.expire(key, ttl)
+
+    def ttl(self, key: str) -> int:
+        return self._client.ttl(key)
+
+    def delete(self, *keys: str) -> int:
+        return self._client.delete(*keys) if keys else 0
+
+
+store = RedisStore(settings.REDIS_URL) if settings.REDIS_URL else MemoryStore()
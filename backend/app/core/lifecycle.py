@@ -0,0 +1,73 @@
+"""
+Process lifecycle state behind the health probes and graceful shutdown.
+
+- live: the process is up and serving requests.
+- ready: caches are warm and the process is not draining; load balancers should
+  only route traffic to ready workers.
+
+The server stops accepting connections as soon as its own SIGTERM handler runs. Only
+after that, and after in-flight requests finish, does the lifespan shutdown run. A
+readiness flip made there comes too late for any load balancer to see.
+`handle_sigterm` therefore puts a handler in front of the server's. It reports
+not-ready at once, keeps serving for a grace period while the probes fail, and then
+hands the signal on.
+"""
+import asyncio
+import logging
+import signal
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.warmed_at = None
+        self.warmup_seconds = None
+
+    def mark_ready(self, warmup_seconds: float) -> None:
+        self.warmup_seconds = round(warmup_seconds, 3)
+        self.warmed_at = time.time()
+        self.ready = True
+
+    def begin_drain(self) -> None:
+        """Stop reporting ready; requests are still served."""
+        self.draining = True
+        self.ready = False
+
+    def handle_sigterm(self, loop: asyncio.AbstractEventLoop, delay: float) -> bool:
+        """
+        Wrap the server's SIGTERM handler: drop readiness now, pass the signal on after
+        delay seconds. A second SIGTERM is passed on at once. Returns False where signals
+        cannot be handled (not the main thread, or no handler to wrap).
+        """
+        if delay <= 0 or threading.current_thread() is not threading.main_thread():
+            return False
+        previous = signal.getsignal(signal.SIGTERM)
+        if not callable(previous):
+            return False
+
+        def on_sigterm(signum, frame):
+            if self.draining:
+                previous(signum, frame)
+                return
+            self.begin_drain()
+            logger.info(f"SIGTERM: not ready, shutting down in {delay}s")
+            # Signal handlers may interrupt the loop mid-step; schedule through the thread-safe path
+            loop.call_soon_threadsafe(loop.call_later, delay, previous, signum, None)
+
+        signal.signal(signal.SIGTERM, on_sigterm)
+        return True
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "draining": self.draining,
+            "warmup_seconds": self.warmup_seconds,
+        }
+
+
+lifecycle = Lifecycle()
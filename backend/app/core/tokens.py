@@ -0,0 +1,191 @@
+"""
+JWT issuing and verification.
+
+- Keys are identified by `kid` in the token header, so a new key can be rolled out
+  (added to SIGNING_KEYS, then made ACTIVE_KEY_ID) while tokens signed with the old
+  one keep verifying until they expire. Tokens from before key ids existed carry no
+  `kid` and were signed with SECRET_KEY; they verify only while SECRET_KEY is still
+  one of the configured keys, so rotating it out of SIGNING_KEYS retires them too.
+- Verified claims are cached in a bounded LRU keyed by the token's SHA-256, so a
+  repeat request with the same bearer token skips the signature check until `exp`.
+- Refresh tokens carry a `jti`. Revoked ids live in an in-memory set of their 16 raw
+  bytes, about 90 bytes per id with the set slot (the hex string would take ~120), that
+  each process reloads from `revoked_tokens` every REVOCATION_SYNC_SECONDS.
+  The unique `jti` column is the authority: revoking twice fails, which is what makes
+  refresh-token rotation safe against replays hitting another worker. Rows are purged
+  hourly once the token they revoke has expired.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Union
+
+from jose import jwt, JWTError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.jobs import job_queue
+from app.db.session import SessionLocal
+from app.models.revoked_token import RevokedToken
+
+DEFAULT_KEY_ID = "default"
+
+
+def _parse_keys(raw: str) -> Dict[str, str]:
+    keys = {}
+    for pair in raw.split(","):
+        if not pair.strip():
+            continue
+        kid, sep, secret = pair.strip().partition(":")
+        if not sep or not kid or not secret:
+            raise ValueError("SIGNING_KEYS entries must look like 'kid:secret'")
+        keys[kid] = secret
+    return keys
+
+
+class TokenService:
+    def __init__(
+        self,
+        keys: Dict[str, str],
+        active_kid: str,
+        algorithm: str,
+        cache_size: int = 10000,
+        revocation_sync_seconds: float = 30,
+        legacy_key: Optional[str] = None,
+    ):
+        if active_kid not in keys:
+            raise ValueError(f"Active signing key '{active_kid}' is not configured")
+        self.keys = keys
+        self.active_kid = active_kid
+        # Verifies tokens without a kid; None rejects them
+        self.legacy_key = legacy_key
+        self.algorithm = algorithm
+        self.cache_size = cache_size
+        self.revocation_sync_seconds = revocation_sync_seconds
+
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._revoked: set = set()
+        self._revoked_synced_at = float("-inf")
+        self._revoked_lock = threading.Lock()
+
+    # Issuing
+
+    def _encode(self, claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, self.keys[self.active_kid], algorithm=self.algorithm,
+                          headers={"kid": self.active_kid})
+
+    def create_access_token(self, subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+        expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+        return self._encode({"exp": expire, "sub": str(subject), "type": "access"})
+
+    def create_refresh_token(self, subject: Union[str, Any]) -> str:
+        expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        return self._encode({"exp": expire, "sub": str(subject), "type": "refresh", "jti": uuid.uuid4().hex})
+
+    # Verification
+
+    def decode(self, token: str, token_type: str = "access") -> Dict[str, Any]:
+        """Verified claims for token, raising JWTError when invalid, expired or of the wrong type."""
+        digest = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+
+        with self._cache_lock:
+            claims = self._cache.get(digest)
+            if claims is not None:
+                if claims["exp"] > now:
+                    self._cache.move_to_end(digest)
+                    return self._check_type(claims, token_type)
+                del self._cache[digest]
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is not None and not isinstance(kid, str):
+            raise JWTError("Invalid key id")
+        key = self.keys.get(kid) if kid else self.legacy_key
+        if key is None:
+            raise JWTError("Unknown signing key")
+        claims = jwt.decode(token, key, algorithms=[self.algorithm])
+        if not isinstance(claims.get("exp"), (int, float)):
+            raise JWTError("Token has no expiry")
+
+        with self._cache_lock:
+            self._cache[digest] = claims
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return self._check_type(claims, token_type)
+
+    @staticmethod
+    def _check_type(claims: Dict[str, Any], token_type: str) -> Dict[str, Any]:
+        # Tokens from before refresh support have no type and are access tokens
+        if claims.get("type", "access") != token_type:
+            raise JWTError("Wrong token type")
+        return claims
+
+    # Revocation
+
+    def sync_revoked(self, db: Session, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._revoked_synced_at < self.revocation_sync_seconds:
+            return
+        jtis = db.query(RevokedToken.jti)\
+            .filter(RevokedToken.expires_at > datetime.now(timezone.utc))\
+            .all()
+        revoked = {bytes.fromhex(jti) for (jti,) in jtis}
+        with self._revoked_lock:
+            self._revoked = revoked
+            self._revoked_synced_at = now
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        self.sync_revoked(db)
+        with self._revoked_lock:
+            return bytes.fromhex(jti) in self._revoked
+
+    @staticmethod
+    def purge_revoked(db: Session) -> int:
+        """Delete revocations whose token has expired anyway; returns how many went (caller commits)."""
+        return db.query(RevokedToken)\
+            .filter(RevokedToken.expires_at <= datetime.now(timezone.utc))\
+            .delete(synchronize_session=False)
+
+    def revoke(self, db: Session, claims: Dict[str, Any]) -> bool:
+        """Revoke a refresh token; False when it was already revoked (e.g. a replay)."""
+        jti = claims["jti"]
+        db.add(RevokedToken(jti=jti, expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc)))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False
+        with self._revoked_lock:
+            self._revoked.add(bytes.fromhex(jti))
+        return True
+
+
+def _build_token_service() -> TokenService:
+    keys = _parse_keys(settings.SIGNING_KEYS) or {DEFAULT_KEY_ID: settings.SECRET_KEY}
+    return TokenService(
+        keys=keys,
+        active_kid=settings.ACTIVE_KEY_ID or next(iter(keys)),
+        algorithm=settings.ALGORITHM,
+        cache_size=settings.TOKEN_CACHE_SIZE,
+        revocation_sync_seconds=settings.REVOCATION_SYNC_SECONDS,
+        # Kid-less tokens were signed with SECRET_KEY; honour them only while it is still a key
+        legacy_key=settings.SECRET_KEY if settings.SECRET_KEY in keys.values() else None,
+    )
+
+
+token_service = _build_token_service()
+
+
+@job_queue.periodic(60 * 60)
+def purge_revoked_tokens() -> None:
+    db = SessionLocal()
+    try:
+        token_service.purge_revoked(db)
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,106 @@
+"""
+Additive schema upgrades for databases created by an older version of the models.
+
+`Base.metadata.create_all` only creates missing tables, so a column added to an
+existing model never reaches a database that already has the table. At startup
+`add_missing_columns` compares each table with the models. It adds missing nullable
+columns with ALTER TABLE ... ADD COLUMN and then creates any declared index that
+does not exist yet. Foreign keys are not added to existing tables. NOT NULL columns
+without a server default cannot be added this way; they are logged and need a
+hand-written migration.
+
+`partition_user_results` is the one upgrade that is not additive: it converts a plain
+`user_results` table from before monthly partitioning into a partitioned one. It
+rewrites the whole table under an exclusive lock, so it is run by hand
+(`python partition_results.py`) rather than at startup.
+"""
+import logging
+from typing import List
+
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import AddConstraint, CreateIndex
+
+from app.db.partitioning import PARTITION_LOCK, add_months, create_partitions, results_relkind
+from app.models.base import Base
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns(engine: Engine) -> List[str]:
+    """Add nullable model columns missing from existing tables; returns "table.column" for each one added."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            skipped = set()
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                if not column.nullable:
+                    logger.error(f"{table.name}.{column.name} is NOT NULL and must be added by hand")
+                    skipped.add(column.name)
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                added.append(f"{table.name}.{column.name}")
+
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes and not skipped & {column.name for column in index.columns}:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+    if added:
+        logger.info(f"Added columns: {', '.join(added)}")
+    return added
+
+
+def partition_user_results(engine: Engine, months_ahead: int = 3) -> bool:
+    """
+    Convert a plain PostgreSQL user_results table into the monthly partitioned layout,
+    in one transaction; returns False when there is nothing to convert. Rows keep their
+    ids and the id sequence carries on from where it was.
+    """
+    if engine.dialect.name != "postgresql":
+        return False
+    table = Base.metadata.tables["user_results"]
+    with engine.begin() as conn:
+        conn.execute(text(PARTITION_LOCK))
+        if results_relkind(conn) != "r":
+            return False
+        conn.execute(text("LOCK TABLE user_results IN ACCESS EXCLUSIVE MODE"))
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('user_results', 'id')")).scalar()
+        # Older schemas allowed a NULL created_at; the partition key cannot be NULL
+        conn.execute(text("UPDATE user_results SET created_at = now() WHERE created_at IS NULL"))
+        first, rows = conn.execute(text("SELECT min(created_at), count(*) FROM user_results")).one()
+
+        # Same columns (and defaults, so ids still come from the old sequence); the
+        # primary key must include the partition column
+        conn.execute(text(
+            "CREATE TABLE user_results_partitioned "
+            "(LIKE user_results INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (created_at)"))
+        conn.execute(text("ALTER TABLE user_results RENAME TO user_results_legacy"))
+        conn.execute(text("ALTER TABLE user_results_partitioned RENAME TO user_results"))
+        conn.execute(text("ALTER TABLE user_results ADD CONSTRAINT user_results_partitioned_pkey "
+                          "PRIMARY KEY (id, created_at)"))
+
+        now = datetime.now(timezone.utc)
+        create_partitions(conn, first or now, add_months(now.date(), months_ahead))
+        conn.execute(text("INSERT INTO user_results SELECT * FROM user_results_legacy"))
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY user_results.id"))
+        conn.execute(text("DROP TABLE user_results_legacy"))
+        conn.execute(text("ALTER TABLE user_results RENAME CONSTRAINT user_results_partitioned_pkey TO user_results_pkey"))
+
+        # Indexes and foreign keys went with the old table; recreate them from the model
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+        for constraint in table.foreign_key_constraints:
+            conn.execute(AddConstraint(constraint))
+    logger.info(f"Converted user_results into monthly partitions ({rows} rows)")
+    return True
@@ -0,0 +1,103 @@
+"""
+Monthly range partitioning for `user_results`.
+
+PostgreSQL: the table is declared with `PARTITION BY RANGE (created_at)` and one
+child table per month (`user_results_pYYYY_MM`) plus a DEFAULT partition so inserts
+never fail. Queries that filter on `created_at` are pruned to the matching months.
+
+SQLite fallback: there is no native partitioning, so `user_results` stays a plain
+table and the `(user_id, created_at)` index gives the same range access. All helpers
+here are no-ops on non-PostgreSQL databases.
+
+`create_all` leaves an existing plain `user_results` table alone. On such a database
+`ensure_result_partitions` logs a warning and does nothing until the table is converted
+with `python partition_results.py` (`partition_user_results` in app/db/migrations.py).
+"""
+import logging
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, make_url
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESULTS_PARTITIONED = make_url(settings.DATABASE_URL).get_backend_name() == "postgresql"
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+DEFAULT_PARTITION = "user_results_default"
+# Every worker maintains the partitions; the advisory lock lets one at a time do it
+PARTITION_LOCK = "SELECT pg_advisory_xact_lock(hashtext('user_results_partitions'))"
+
+
+def results_relkind(conn) -> Optional[str]:
+    """pg_class.relkind of user_results: 'p' partitioned, 'r' plain table, None if missing."""
+    return conn.execute(text(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass('user_results')")).scalar()
+
+
+def create_partitions(conn, first: date, last: date) -> None:
+    """Create DEFAULT and every monthly partition from first through last (caller holds PARTITION_LOCK)."""
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF user_results DEFAULT"))
+    lower = month_start(first)
+    while lower <= last:
+        upper = add_months(lower, 1)
+        _create_month(conn, lower, upper)
+        lower = upper
+
+
+def _create_month(conn, lower: date, upper: date) -> None:
+    """Create one month's partition, first moving any of its rows out of DEFAULT."""
+    name = f"user_results_p{lower:%Y_%m}"
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return
+    bounds = {"lower": lower, "upper": upper}
+    in_range = "created_at >= :lower AND created_at < :upper"
+    create = f"CREATE TABLE {name} PARTITION OF user_results FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    stranded = conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"), bounds).scalar()
+    if not stranded:
+        conn.execute(text(create))
+        return
+    # PostgreSQL refuses a partition whose rows already sit in DEFAULT: detach it,
+    # create the month, move its rows across and attach DEFAULT again (one transaction)
+    logger.warning(f"Moving {lower:%Y-%m} rows out of {DEFAULT_PARTITION}")
+    conn.execute(text(f"ALTER TABLE user_results DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(text(create))
+    conn.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    conn.execute(text(f"ALTER TABLE user_results ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def ensure_result_partitions(engine: Engine, months_back: int = 1, months_ahead: int = 3) -> bool:
+    """
+    Create the monthly partitions around the current month; returns whether the table is partitioned.
+    Run at startup, hourly from the job poller (app/utils/retention.py) and by the
+    retention job. A month whose rows already landed in DEFAULT, because none of those
+    ran in time, gets its rows moved into the new partition.
+    """
+    if engine.dialect.name != "postgresql":
+        return False
+
+    current = month_start(datetime.now(timezone.utc))
+    with engine.begin() as conn:
+        conn.execute(text(PARTITION_LOCK))
+        relkind = results_relkind(conn)
+        if relkind != "p":
+            if relkind is not None:
+                logger.warning("user_results is a plain table, so monthly partitions are skipped; "
+                               "run `python partition_results.py` to convert it")
+            return False
+        create_partitions(conn, add_months(current, -months_back), add_months(current, months_ahead))
+    logger.info("user_results partitions ensured")
+    return True
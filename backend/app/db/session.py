@@ -1,6 +1,18 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.selectable import GenerativeSelect
 from app.core.config import settings
+from app.core.kvstore import store as kv_store
+
+logger = logging.getLogger(__name__)
 
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -11,3 +23,113 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica and writes to the primary.
+    The replica is picked once per session so a request sees a single snapshot.
+    Only plain SELECTs go to the replica: flushes, INSERT/UPDATE/DELETE, SELECT ... FOR
+    UPDATE and textual SQL (which may write, e.g. pg_notify or DDL) go to the primary.
+    """
+
+    def __init__(self, primary: Engine, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica is None or self._flushing or not self._read_only(clause):
+            return self.primary
+        return self.replica
+
+    @staticmethod
+    def _read_only(clause) -> bool:
+        return isinstance(clause, GenerativeSelect) and clause._for_update_arg is None
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping ones that failed their last health check."""
+
+    def __init__(self, urls: List[str], health_check_interval: float):
+        self.engines = [create_engine(url, pool_pre_ping=True) for url in urls]
+        self.health_check_interval = health_check_interval
+        self._status: Dict[int, Tuple[float, bool]] = {}  # index -> (checked_at, healthy)
+        self._cursor = itertools.count()
+        self._lock = threading.Lock()
+
+    def choose(self) -> Optional[Engine]:
+        for _ in range(len(self.engines)):
+            idx = next(self._cursor) % len(self.engines)
+            if self._is_healthy(idx):
+                return self.engines[idx]
+        return None
+
+    def _is_healthy(self, idx: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            checked_at, healthy = self._status.get(idx, (float("-inf"), True))
+            if now - checked_at < self.health_check_interval:
+                return healthy
+            # Claim the check so concurrent requests don't all probe at once
+            self._status[idx] = (now, healthy)
+
+        healthy = self._probe(self.engines[idx])
+        with self._lock:
+            self._status[idx] = (now, healthy)
+        return healthy
+
+    @staticmethod
+    def _probe(replica: Engine) -> bool:
+        try:
+            with replica.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"Replica {replica.url.render_as_string()} failed health check: {e}")
+            return False
+
+
+class ReadRouter:
+    """
+    Hands out sessions for read-only endpoints.
+    Reads go to a healthy replica, falling back to the primary when none is available
+    or when the user wrote recently (read-your-writes stickiness). Pins are kept in the
+    key/value store, which is Redis whenever several workers run, so a read follows the
+    write whichever worker serves it.
+    """
+
+    def __init__(self, primary: Engine, replica_urls: List[str],
+                 health_check_interval: float = 30, sticky_seconds: float = 10, store=None):
+        self.primary = primary
+        self.replicas = ReplicaSet(replica_urls, health_check_interval) if replica_urls else None
+        self.sticky_seconds = sticky_seconds
+        self.store = store if store is not None else kv_store
+
+    @staticmethod
+    def _pin_key(user_id: int) -> str:
+        return f"replica_pin:{user_id}"
+
+    def record_write(self, user_id: int) -> None:
+        if self.replicas is None or self.sticky_seconds <= 0:
+            return
+        self.store.hset(self._pin_key(user_id), {"at": time.time()}, ttl=int(math.ceil(self.sticky_seconds)))
+
+    def is_pinned(self, user_id: Optional[int]) -> bool:
+        if user_id is None or self.replicas is None:
+            return False
+        return self.store.hget(self._pin_key(user_id), "at") is not None
+
+    def session(self, user_id: Optional[int] = None) -> RoutingSession:
+        replica = None
+        if self.replicas is not None and not self.is_pinned(user_id):
+            replica = self.replicas.choose()
+        return RoutingSession(primary=self.primary, replica=replica, autoflush=False)
+
+
+read_router = ReadRouter(
+    engine,
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    health_check_interval=settings.REPLICA_HEALTH_CHECK_SECONDS,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+)
@@ -1,22 +1,91 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import signup, login, home, contact
+from starlette.concurrency import run_in_threadpool
+from app.api.v1.endpoints import signup, login, home, contact, health
 from app.models.base import Base
-from app.db.session import engine
+from app.db.session import engine, SessionLocal
 # Import all models so Base.metadata knows about them
 import app.models.user
 import app.models.profile
 import app.models.mcq
+import app.models.subject
+import app.models.question_bank
 import app.models.result 
+import app.models.result_rollup
+import app.models.revoked_token
+import app.models.review
+import app.models.progress
+import app.models.seen_questions
+import app.models.job
+import app.models.cache_version
 from app.db.utils import ensure_db_exists
+from app.db.migrations import add_missing_columns
+from app.db.partitioning import ensure_result_partitions
+from app.core.cache_bus import cache_bus
+from app.core.config import settings
+from app.core.jobs import job_queue
+from app.core.lifecycle import lifecycle
+from app.utils.question_banks import ensure_legacy_bank
+from app.utils.questions import warm_answer_keys
+from app.utils.subjects import ensure_subjects, subject_registry
+
+logger = logging.getLogger(__name__)
 
 # Create database if it doesn't exist
 # ensure_db_exists()
 
-# Create tables
+# Create tables, and add columns introduced since an existing database was created
 Base.metadata.create_all(bind=engine)
+add_missing_columns(engine)
+ensure_result_partitions(engine)
+
+def backfill_legacy_rows() -> None:
+    """Fill new columns on rows written before they existed, so filters on them match."""
+    db = SessionLocal()
+    try:
+        ensure_subjects(db)
+        ensure_legacy_bank(db)
+        db.commit()
+    finally:
+        db.close()
+
+backfill_legacy_rows()
+
+def warm_caches() -> None:
+    """Fill the process-local caches so the first requests after boot are cache hits."""
+    db = SessionLocal()
+    try:
+        subject_registry.warm(db)
+        keys = warm_answer_keys(db)
+        home.stats_cache.get_or_load("home", lambda: home.load_home_stats(db))
+        assessment.overview_cache.get_or_load("overview", lambda: assessment.load_overview(db))
+    finally:
+        db.close()
+    logger.info(f"Caches warm: {keys} answer keys")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker, after the fork when the app is preloaded
+    started = time.monotonic()
+    cache_bus.start()
+    job_queue.start()
+    await run_in_threadpool(warm_caches)
+    lifecycle.mark_ready(time.monotonic() - started)
+    # The server's signal handlers are installed by now; readiness drops ahead of them
+    lifecycle.handle_sigterm(asyncio.get_running_loop(), settings.SHUTDOWN_DELAY_SECONDS)
+    yield
+    # The server has stopped accepting connections and finished in-flight requests
+    lifecycle.begin_drain()
+    # Post-submit jobs finish here or are persisted for another worker to pick up
+    await run_in_threadpool(job_queue.stop, settings.SHUTDOWN_DRAIN_SECONDS)
+    cache_bus.stop()
 
-app = FastAPI(title="GovTech API")
+app = FastAPI(title="GovTech API", lifespan=lifespan)
 
 # Configure CORS
 origins = [
@@ -45,9 +114,12 @@ app.include_router(signup.router, prefix="/api/v1/auth", tags=["signup"])
 app.include_router(login.router, prefix="/api/v1/auth", tags=["login"])
 app.include_router(home.router, prefix="/api/v1/home", tags=["home"])
 app.include_router(contact.router, prefix="/api/v1", tags=["contact"])
-from app.api.v1.endpoints import profile, assessment
+from app.api.v1.endpoints import profile, assessment, exam_session, admin
 app.include_router(profile.router, prefix="/api/v1/profile", tags=["profile"])
 app.include_router(assessment.router, prefix="/api/v1/assessment", tags=["assessment"])
+app.include_router(exam_session.router, prefix="/api/v1/assessment/session", tags=["assessment"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
+app.include_router(health.router, prefix="/api/v1/health", tags=["health"])
 
 from fastapi.staticfiles import StaticFiles
 import os
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.models.base import Base
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    key = Column(String, primary_key=True) # e.g. "questions", "profile:42"
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True) # Polled by workers without NOTIFY
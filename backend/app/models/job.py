@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class BackgroundJob(Base):
+    """Durable side of the job queue: overflow, scheduled retries and dead letters."""
+    __tablename__ = "background_jobs"
+
+    __table_args__ = (
+        Index('idx_background_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    key = Column(String(100), nullable=True) # Jobs sharing a key run one at a time, in order (per process)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="pending") # pending / running / dead
+    attempts = Column(Integer, nullable=False, default=0) # Attempts already made
+    last_error = Column(Text, nullable=True)
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
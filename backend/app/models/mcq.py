@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Index
+from sqlalchemy import Column, Integer, String, Text, Index, ForeignKey
 from app.models.base import Base
 
 class MCQ(Base):
@@ -6,10 +6,16 @@ class MCQ(Base):
 
     __table_args__ = (
         Index('idx_mcq_subject_difficulty', 'subject', 'difficulty_level'),
+        # Reads are scoped to one bank snapshot (see app/utils/question_banks.py)
+        Index('idx_mcq_bank_subject_difficulty', 'bank_id', 'subject_id', 'difficulty_level'),
+        Index('idx_mcq_bank_topic_difficulty', 'bank_id', 'topic_id', 'difficulty_level'),
     )
 
     id = Column(Integer, primary_key=True, index=True)
-    subject = Column(String(50), nullable=False, index=True)
+    bank_id = Column(Integer, ForeignKey("question_banks.id"), nullable=True) # Rows are never edited in place
+    subject = Column(String(50), nullable=False, index=True) # Subject code, kept for API output
+    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=True)
+    topic_id = Column(Integer, ForeignKey("subjects.id"), nullable=True) # Chapter within the subject
     difficulty_level = Column(Integer, nullable=False)
     question = Column(Text, nullable=False)
     option_a = Column(Text, nullable=False)
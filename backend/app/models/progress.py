@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, UniqueConstraint, Index
+from app.models.base import Base
+
+# Rollups behind GET /profile/progress, updated incrementally by each submitted attempt.
+# Their size depends on active days and topics, not on the number of attempts.
+
+class UserProgressDaily(Base):
+    """Attempts per user, subject and UTC day."""
+    __tablename__ = "progress_daily"
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'subject', 'day', name='uq_progress_daily_user_subject_day'),
+        Index('idx_progress_daily_user_day', 'user_id', 'day'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    subject = Column(String, nullable=False)
+    day = Column(Date, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    questions_sum = Column(Integer, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0)
+
+class UserTopicProgress(Base):
+    """Answered / correct counts per user and topic (chapter, or subject without chapters)."""
+    __tablename__ = "progress_topics"
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'topic_id', name='uq_progress_topic_user_topic'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    topic_id = Column(Integer, ForeignKey("subjects.id"), nullable=False)
+    answered = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+
+class UserProgressSummary(Base):
+    """All-time counters and the daily activity streak."""
+    __tablename__ = "progress_summary"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    current_streak = Column(Integer, nullable=False, default=0) # Consecutive active days ending at last_active_day
+    longest_streak = Column(Integer, nullable=False, default=0)
+    last_active_day = Column(Date, nullable=True)
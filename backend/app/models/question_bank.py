@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class QuestionBank(Base):
+    __tablename__ = "question_banks"
+
+    # At most one active bank; activation retires the previous one in the same transaction
+    __table_args__ = (
+        Index(
+            'uq_question_banks_active', 'status', unique=True,
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=True) # e.g. the CSV file it was loaded from
+    status = Column(String(16), nullable=False, default="staging") # staging | active | retired
+    question_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    activated_at = Column(DateTime(timezone=True), nullable=True)
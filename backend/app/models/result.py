@@ -1,15 +1,36 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.sql import func
+from app.db.partitioning import RESULTS_PARTITIONED
 from app.models.base import Base
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
 class UserResult(Base):
     __tablename__ = "user_results"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # On PostgreSQL the table is partitioned by month (see app/db/partitioning.py), which
+    # requires created_at in the primary key. Set client-side so the ORM knows the full key.
+    __table_args__ = (
+        Index('idx_user_results_user_created', 'user_id', 'created_at'),
+        {"postgresql_partition_by": "RANGE (created_at)"} if RESULTS_PARTITIONED else {},
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     subject = Column(String, nullable=False)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=True, index=True)
+    bank_id = Column(Integer, ForeignKey("question_banks.id"), nullable=True) # Bank the answered questions came from
     score = Column(Integer, nullable=False)
     total_questions = Column(Integer, nullable=False)
     accuracy = Column(Float, nullable=False)
-    answers = Column(JSON, nullable=True) # Stores list of {question_id, selected_answer, is_correct}
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    answers = Column(JSON, nullable=True) # Stores list of {question_id, selected_answer, is_correct}; NULL once compacted
+    processed_at = Column(DateTime(timezone=True), nullable=True) # Set by the post-submit job; a replay skips the result
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=RESULTS_PARTITIONED,
+        nullable=False,
+        default=utcnow,
+        server_default=func.now(),
+    )
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, UniqueConstraint
+from app.models.base import Base
+
+class UserResultRollup(Base):
+    """Per-user, per-subject monthly totals for attempts whose answer blobs were compacted."""
+    __tablename__ = "user_result_rollups"
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'subject', 'month', name='uq_rollup_user_subject_month'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    subject = Column(String, nullable=False)
+    month = Column(Date, nullable=False, index=True) # First day of the month
+    attempts = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    questions_sum = Column(Integer, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0)
+
+class UserTopicRollup(Base):
+    """Per-user, per-topic monthly answered / correct counts, graded from answer blobs before they are compacted."""
+    __tablename__ = "user_topic_rollups"
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'topic_id', 'month', name='uq_topic_rollup_user_topic_month'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    topic_id = Column(Integer, ForeignKey("subjects.id"), nullable=False) # Chapter, or subject without chapters
+    month = Column(Date, nullable=False, index=True) # First day of the month
+    answered = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, UniqueConstraint, Index
+from app.models.base import Base
+
+class ReviewItem(Base):
+    """SM-2 schedule for one missed question of one user."""
+    __tablename__ = "review_items"
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'mcq_id', name='uq_review_user_mcq'),
+        # Building a review set is one range scan: user_id = ? AND due_at <= now ORDER BY due_at
+        Index('idx_review_user_due', 'user_id', 'due_at'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    mcq_id = Column(Integer, nullable=False) # No FK, like UserResult.answers: reseeding must not cascade here
+    repetitions = Column(Integer, nullable=False, default=0)
+    interval_days = Column(Integer, nullable=False, default=0)
+    ease_factor = Column(Float, nullable=False, default=2.5)
+    lapses = Column(Integer, nullable=False, default=0)
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    last_reviewed_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(32), unique=True, index=True, nullable=False) # Refresh token id (uuid hex)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True) # Row is useless after this
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
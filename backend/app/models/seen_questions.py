@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class SeenQuestions(Base):
+    """Bloom filters of the MCQ ids a user was recently shown in one subject (see app/utils/seen_questions.py)."""
+    __tablename__ = "seen_questions"
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'subject_id', name='uq_seen_questions_user_subject'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False)
+    current = Column(LargeBinary, nullable=False) # Generation being filled
+    current_count = Column(Integer, nullable=False, default=0) # Ids added to `current`
+    previous = Column(LargeBinary, nullable=True) # Full generation before it, still consulted
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.orm import relationship
+from app.models.base import Base
+
+class Subject(Base):
+    """Subject taxonomy. Top-level rows are subjects ("ds"); rows with a parent are chapters ("ds.trees")."""
+    __tablename__ = "subjects"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String(100), unique=True, index=True, nullable=False) # Lowercase
+    name = Column(String, nullable=False)
+    parent_id = Column(Integer, ForeignKey("subjects.id"), nullable=True, index=True)
+
+    parent = relationship("Subject", remote_side=[id], backref="chapters")
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional
+from app.schemas.mcq import MCQ
+
+class ExamSessionStart(BaseModel):
+    subject: str
+    difficulty: str = "Medium" # Low / Medium / Hard / Mix
+    count: int = Field(25, ge=1, le=200)
+    topic: Optional[str] = None # Chapter within the subject
+    fresh: bool = False # Prefer questions the user has not seen recently
+
+class AnswerPatch(BaseModel):
+    answers: Dict[int, str] # Only the answers changed since the last autosave
+
+class ExamSessionResponse(BaseModel):
+    session_id: str
+    subject: str
+    expires_in: int # Seconds until the session is discarded without autosaves
+    questions: List[MCQ]
+    answers: Dict[int, str] = {}
+
+class AutosaveResponse(BaseModel):
+    saved: int
+    expires_in: int
+
+class ExamSessionResult(BaseModel):
+    result_id: int
+    score: int
+    total_questions: int
+    accuracy: float
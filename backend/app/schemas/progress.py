@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+class ProgressPoint(BaseModel):
+    period: date # First day of the bucket
+    attempts: int
+    accuracy: float
+
+class SubjectProgress(BaseModel):
+    subject: str
+    attempts: int
+    accuracy: float
+    series: List[ProgressPoint]
+
+class TopicProgress(BaseModel):
+    code: str
+    name: str
+    answered: int
+    accuracy: float
+
+class ProgressSummary(BaseModel):
+    attempts: int
+    current_streak: int
+    longest_streak: int
+    last_active_day: Optional[date] = None
+
+class ProgressResponse(BaseModel):
+    summary: ProgressSummary
+    series: List[ProgressPoint]
+    subjects: List[SubjectProgress]
+    weak_topics: List[TopicProgress]
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class QuestionBankResponse(BaseModel):
+    id: int
+    source: Optional[str] = None
+    status: str
+    question_count: int
+    created_at: Optional[datetime] = None
+    activated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Dict
+
+class ReviewSubmission(BaseModel):
+    answers: Dict[int, str] # question_id -> selected_option
+
+class ReviewResult(BaseModel):
+    reviewed: int
+    correct: int
+    due_remaining: int
@@ -0,0 +1,211 @@
+"""
+Streaming exports of `user_results` and `mcq`.
+
+Rows are read in fixed-size batches through `yield_per` (a server-side cursor on
+PostgreSQL) and each batch is encoded and handed on before the next is fetched, so
+memory stays flat whatever the table size. CSV is gzip-compressed on the fly;
+Parquet (needs the optional `pyarrow` package) is written one row group per batch.
+
+Incremental exports pass the previous run's watermark (`since_id`, or `since` for
+results' created_at). The upper bound is fixed when the export starts, so rows
+inserted mid-export land in the next run instead of being split across two.
+
+Ids are allocated before commit, so on PostgreSQL a lower id can become visible after
+a higher one. The watermark therefore stays clear of rows that may still be in flight.
+For results it is the highest id created more than EXPORT_LAG_SECONDS ago. A result
+transaction held open longer than that could still be skipped. For questions it stops
+below the first row of a bank that is still loading.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+
+from sqlalchemy import DateTime, Float, Integer, func, select
+from sqlalchemy.orm import Session
+
+from app.models.mcq import MCQ
+from app.models.question_bank import QuestionBank
+from app.models.result import UserResult
+from app.utils.question_banks import STAGING
+
+BATCH_SIZE = 5000
+# Longer than any result insert transaction stays open
+EXPORT_LAG_SECONDS = 60
+
+EXPORT_COLUMNS = {
+    "results": (
+        UserResult.id,
+        UserResult.user_id,
+        UserResult.subject,
+        UserResult.bank_id,
+        UserResult.score,
+        UserResult.total_questions,
+        UserResult.accuracy,
+        UserResult.answers,
+        UserResult.created_at,
+    ),
+    "questions": (
+        MCQ.id,
+        MCQ.bank_id,
+        MCQ.subject,
+        MCQ.difficulty_level,
+        MCQ.question,
+        MCQ.option_a,
+        MCQ.option_b,
+        MCQ.option_c,
+        MCQ.option_d,
+        MCQ.correct_answer,
+        MCQ.explanation,
+    ),
+}
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+
+def export_watermark(db: Session, dataset: str) -> Optional[int]:
+    """Highest id the export will include; the next incremental run starts after it."""
+    if dataset == "results":
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=EXPORT_LAG_SECONDS)
+        return db.query(func.max(UserResult.id)).filter(UserResult.created_at <= cutoff).scalar()
+    # Banks load in committed batches; stop below the first row of one still loading
+    loading = db.query(func.min(MCQ.id)).join(QuestionBank, MCQ.bank_id == QuestionBank.id)\
+        .filter(QuestionBank.status == STAGING).scalar()
+    if loading is not None:
+        return loading - 1
+    return db.query(func.max(MCQ.id)).scalar()
+
+
+def iter_batches(
+    db: Session,
+    dataset: str,
+    until_id: int,
+    since_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[List]:
+    columns = EXPORT_COLUMNS[dataset]
+    id_column = columns[0]
+    stmt = select(*columns).where(id_column <= until_id).order_by(id_column)
+    if since_id is not None:
+        stmt = stmt.where(id_column > since_id)
+    if since is not None and dataset == "results":
+        stmt = stmt.where(UserResult.created_at >= since)
+
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield partition
+
+
+def _plain(value):
+    # JSON answer blobs are strings in both formats; datetimes only in CSV
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(",", ":"))
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _parquet_value(value):
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+def csv_gzip_chunks(dataset: str, batches: Iterator[List]) -> Iterator[bytes]:
+    """Gzip-compressed CSV, one compressed chunk per batch."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # gzip container
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([column.key for column in EXPORT_COLUMNS[dataset]])
+    for batch in batches:
+        writer.writerows([[_plain(value) for value in row] for row in batch])
+        chunk = compressor.compress(buffer.getvalue().encode("utf-8"))
+        buffer.seek(0)
+        buffer.truncate()
+        if chunk:
+            yield chunk
+    yield compressor.compress(buffer.getvalue().encode("utf-8")) + compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that buffers bytes until the caller drains them."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_type(column):
+    import pyarrow as pa
+
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        # Naive values (SQLite) are UTC, as written
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    # Text, and JSON flattened to a string
+    return pa.string()
+
+
+def _parquet_schema(dataset: str):
+    """Arrow schema in EXPORT_COLUMNS order, so rows and fields always line up."""
+    import pyarrow as pa
+
+    return pa.schema([(column.key, _arrow_type(column)) for column in EXPORT_COLUMNS[dataset]])
+
+
+def parquet_chunks(dataset: str, batches: Iterator[List]) -> Iterator[bytes]:
+    """Parquet (snappy), one row group per batch."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(dataset)
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for batch in batches:
+            columns = list(zip(*[[_parquet_value(value) for value in row] for row in batch]))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_chunks(db: Session, dataset: str, fmt: str, until_id: int,
+                  since_id: Optional[int] = None, since: Optional[datetime] = None) -> Iterator[bytes]:
+    batches = iter_batches(db, dataset, until_id, since_id=since_id, since=since)
+    if fmt == "parquet":
+        return parquet_chunks(dataset, batches)
+    return csv_gzip_chunks(dataset, batches)
+
+
+def export_filename(dataset: str, fmt: str) -> str:
+    return f"{dataset}.parquet" if fmt == "parquet" else f"{dataset}.csv.gz"
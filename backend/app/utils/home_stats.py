@@ -0,0 +1,43 @@
+"""
+Coalesced invalidation of the home page stats.
+
+Publishing "stats" bumps a single `cache_versions` row, so doing it inside every
+signup's transaction would serialize concurrent signups on that row lock. A signup
+only marks the stats as changed instead. Each process then publishes at most once
+per STATS_PUBLISH_SECONDS, from the job poller and in its own transaction. The user
+count on the home page may therefore lag by up to that interval.
+"""
+import logging
+import threading
+
+from app.core.cache_bus import cache_bus
+from app.core.jobs import job_queue
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+STATS_PUBLISH_SECONDS = 30
+
+_changed = threading.Event()
+
+
+def mark_stats_changed() -> None:
+    """Note that the home stats moved; published by the next `publish_stats` run."""
+    _changed.set()
+
+
+@job_queue.periodic(STATS_PUBLISH_SECONDS)
+def publish_stats() -> None:
+    if not _changed.is_set():
+        return
+    _changed.clear()
+    db = SessionLocal()
+    try:
+        cache_bus.publish(db, "stats")
+        db.commit()
+    except Exception:
+        # Try again on the next run
+        _changed.set()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,160 @@
+
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.progress import UserProgressDaily, UserTopicProgress, UserProgressSummary
+from app.models.subject import Subject
+
+BUCKETS = ("day", "week", "month")
+WEAK_TOPIC_MIN_ANSWERED = 5
+WEAK_TOPIC_LIMIT = 5
+
+def update_progress(
+    db: Session,
+    user_id: int,
+    subject: str,
+    score: int,
+    total_questions: int,
+    accuracy: float,
+    graded: Dict[int, bool],
+    topics: Dict[int, Optional[int]],
+    when: Optional[datetime] = None,
+) -> None:
+    """
+    Fold one attempt into the user's progress rollups (caller commits).
+    graded is question id -> correct, topics is question id -> topic id.
+    """
+    day = (when or datetime.now(timezone.utc)).date()
+
+    daily = db.query(UserProgressDaily).filter(
+        UserProgressDaily.user_id == user_id,
+        UserProgressDaily.subject == subject,
+        UserProgressDaily.day == day
+    ).first()
+    if daily is None:
+        daily = UserProgressDaily(user_id=user_id, subject=subject, day=day,
+                                  attempts=0, score_sum=0, questions_sum=0, accuracy_sum=0)
+        db.add(daily)
+    daily.attempts += 1
+    daily.score_sum += score
+    daily.questions_sum += total_questions
+    daily.accuracy_sum += accuracy
+
+    summary = db.query(UserProgressSummary).filter(UserProgressSummary.user_id == user_id).first()
+    if summary is None:
+        summary = UserProgressSummary(user_id=user_id, attempts=0, current_streak=0, longest_streak=0)
+        db.add(summary)
+    summary.attempts += 1
+    # A retried or late job can carry an older day; only a newer day moves the streak
+    if summary.last_active_day is None or day > summary.last_active_day:
+        if summary.last_active_day == day - timedelta(days=1):
+            summary.current_streak += 1
+        else:
+            summary.current_streak = 1
+        summary.last_active_day = day
+        summary.longest_streak = max(summary.longest_streak, summary.current_streak)
+
+    answered, correct = Counter(), Counter()
+    for qid, is_correct in graded.items():
+        topic_id = topics.get(qid)
+        if topic_id is not None:
+            answered[topic_id] += 1
+            correct[topic_id] += int(is_correct)
+    if answered:
+        rows = {
+            row.topic_id: row
+            for row in db.query(UserTopicProgress).filter(
+                UserTopicProgress.user_id == user_id,
+                UserTopicProgress.topic_id.in_(list(answered))
+            )
+        }
+        for topic_id, count in answered.items():
+            row = rows.get(topic_id)
+            if row is None:
+                row = UserTopicProgress(user_id=user_id, topic_id=topic_id, answered=0, correct=0)
+                db.add(row)
+            row.answered += count
+            row.correct += correct[topic_id]
+
+def bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+def _points(buckets: Dict[date, List[float]]) -> List[dict]:
+    # Each bucket holds [attempts, accuracy_sum]
+    return [
+        {"period": period, "attempts": int(attempts), "accuracy": round(acc_sum / attempts, 2)}
+        for period, (attempts, acc_sum) in sorted(buckets.items())
+    ]
+
+def get_progress(db: Session, user_id: int, days: int, bucket: str) -> dict:
+    """Dashboard payload read purely from rollups: O(active days + topics), not O(attempts)."""
+    today = datetime.now(timezone.utc).date()
+    since = today - timedelta(days=days - 1)
+
+    daily_rows = db.query(
+        UserProgressDaily.subject,
+        UserProgressDaily.day,
+        UserProgressDaily.attempts,
+        UserProgressDaily.accuracy_sum
+    ).filter(
+        UserProgressDaily.user_id == user_id,
+        UserProgressDaily.day >= since
+    ).all()
+
+    overall = defaultdict(lambda: [0, 0.0])
+    per_subject = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+    for subject, day, attempts, accuracy_sum in daily_rows:
+        period = bucket_start(day, bucket)
+        for target in (overall[period], per_subject[subject][period]):
+            target[0] += attempts
+            target[1] += accuracy_sum
+
+    subjects = []
+    for subject, buckets in sorted(per_subject.items()):
+        attempts = sum(b[0] for b in buckets.values())
+        accuracy_sum = sum(b[1] for b in buckets.values())
+        subjects.append({
+            "subject": subject,
+            "attempts": attempts,
+            "accuracy": round(accuracy_sum / attempts, 2),
+            "series": _points(buckets),
+        })
+
+    topic_rows = db.query(UserTopicProgress.answered, UserTopicProgress.correct, Subject.code, Subject.name)\
+        .join(Subject, Subject.id == UserTopicProgress.topic_id)\
+        .filter(
+            UserTopicProgress.user_id == user_id,
+            UserTopicProgress.answered >= WEAK_TOPIC_MIN_ANSWERED
+        ).all()
+    weak_topics = sorted(
+        (
+            {"code": code, "name": name, "answered": answered, "accuracy": round(correct / answered * 100, 2)}
+            for answered, correct, code, name in topic_rows
+        ),
+        key=lambda t: (t["accuracy"], -t["answered"])
+    )[:WEAK_TOPIC_LIMIT]
+
+    summary = db.query(UserProgressSummary).filter(UserProgressSummary.user_id == user_id).first()
+    current_streak = 0
+    if summary and summary.last_active_day and summary.last_active_day >= today - timedelta(days=1):
+        # The streak is still alive if the user was active today or yesterday
+        current_streak = summary.current_streak
+
+    return {
+        "summary": {
+            "attempts": summary.attempts if summary else 0,
+            "current_streak": current_streak,
+            "longest_streak": summary.longest_streak if summary else 0,
+            "last_active_day": summary.last_active_day if summary else None,
+        },
+        "series": _points(overall),
+        "subjects": subjects,
+        "weak_topics": weak_topics,
+    }
@@ -0,0 +1,77 @@
+"""
+Versioned question banks.
+
+Every import of the question CSV lands in a new `question_banks` row ("staging"). Its
+questions are inserted next to the active bank's, in committed batches, so readers never
+wait on the load. Activation flips two bank rows in one transaction. Readers pick the new
+bank up at their next lookup of the cached active-bank pointer. Questions of retired banks
+stay in place, so result history, review items and exams already in progress keep resolving
+the ids they hold.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache_bus import LocalCache, cache_bus
+from app.models.mcq import MCQ
+from app.models.question_bank import QuestionBank
+
+ACTIVE = "active"
+STAGING = "staging"
+RETIRED = "retired"
+
+# Cleared on activation (bus key "bank")
+_bank_pointer = LocalCache(cache_bus, "bank")
+
+def active_bank_id(db: Session) -> Optional[int]:
+    """Id of the bank new reads should see; a dictionary hit after the first call."""
+    return _bank_pointer.get_or_load(
+        "active",
+        lambda: db.query(QuestionBank.id).filter(QuestionBank.status == ACTIVE).scalar()
+    )
+
+def create_bank(db: Session, source: Optional[str] = None) -> QuestionBank:
+    """Open a staging bank to load questions into (commits, so the load can batch its own commits)."""
+    bank = QuestionBank(source=source, status=STAGING, question_count=0)
+    db.add(bank)
+    db.commit()
+    db.refresh(bank)
+    return bank
+
+def activate_bank(db: Session, bank: QuestionBank) -> QuestionBank:
+    """Make bank the one new reads see and retire the previous one, atomically (commits)."""
+    db.query(QuestionBank).filter(QuestionBank.status == ACTIVE, QuestionBank.id != bank.id)\
+        .update({QuestionBank.status: RETIRED}, synchronize_session=False)
+    bank.status = ACTIVE
+    bank.activated_at = datetime.now(timezone.utc)
+    bank.question_count = db.query(MCQ.id).filter(MCQ.bank_id == bank.id).count()
+    for key in ("bank", "questions", "stats"):
+        cache_bus.publish(db, key)
+    db.commit()
+    db.refresh(bank)
+    return bank
+
+def discard_bank(db: Session, bank_id: int) -> None:
+    """Remove a staging bank whose load failed (commits). Active and retired banks are kept."""
+    bank = db.query(QuestionBank).filter(QuestionBank.id == bank_id, QuestionBank.status == STAGING).first()
+    if bank is None:
+        return
+    db.query(MCQ).filter(MCQ.bank_id == bank_id).delete(synchronize_session=False)
+    db.delete(bank)
+    db.commit()
+
+def ensure_legacy_bank(db: Session) -> None:
+    """Put questions loaded before banks existed into one bank, active if nothing else is (caller commits)."""
+    if db.query(MCQ.id).filter(MCQ.bank_id.is_(None)).first() is None:
+        return
+    has_active = db.query(QuestionBank.id).filter(QuestionBank.status == ACTIVE).first() is not None
+    bank = QuestionBank(source="legacy", status=RETIRED if has_active else ACTIVE)
+    if not has_active:
+        bank.activated_at = datetime.now(timezone.utc)
+    db.add(bank)
+    db.flush()
+    bank.question_count = db.query(MCQ).filter(MCQ.bank_id.is_(None))\
+        .update({MCQ.bank_id: bank.id}, synchronize_session=False)
+    for key in ("bank", "questions", "stats"):
+        cache_bus.publish(db, key)
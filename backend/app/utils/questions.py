@@ -0,0 +1,112 @@
+
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.cache_bus import LocalCache, cache_bus
+from app.models.mcq import MCQ
+from app.utils.question_banks import active_bank_id
+from app.utils.seen_questions import FRESH_OVERSAMPLE, SeenFilter, prefer_unseen
+from app.utils.serialization import MCQ_COLUMNS
+from app.utils.subjects import chapter_code, subject_registry
+
+LEVEL_MAP = {"low": 1, "medium": 2, "hard": 3}
+
+def sample_questions(
+    db: Session,
+    subject: str,
+    difficulty: str,
+    limit: int,
+    topic: Optional[str] = None,
+    seen: Optional[SeenFilter] = None,
+) -> List:
+    """
+    Random MCQ rows (MCQ_COLUMNS) from the active bank for a subject, optionally narrowed
+    to one chapter. difficulty is Low/Medium/Hard or Mix. Codes resolve to ids through the
+    cached registry, so the filter is an exact match on the (bank_id, subject_id|topic_id,
+    difficulty) index. With a seen filter, questions the user was not shown recently come first.
+    """
+    bank_id = active_bank_id(db)
+    if bank_id is None:
+        return []
+    if topic:
+        topic_id = subject_registry.resolve(db, chapter_code(subject.strip().lower(), topic))
+        if topic_id is None:
+            return []
+        query = db.query(*MCQ_COLUMNS).filter(MCQ.bank_id == bank_id, MCQ.topic_id == topic_id)
+    else:
+        subject_id = subject_registry.resolve(db, subject)
+        if subject_id is None:
+            return []
+        query = db.query(*MCQ_COLUMNS).filter(MCQ.bank_id == bank_id, MCQ.subject_id == subject_id)
+    
+    if difficulty.lower() != "mix":
+        level = LEVEL_MAP.get(difficulty.lower())
+        if level:
+            query = query.filter(MCQ.difficulty_level == level)
+            
+    # Note: func.random() can be slow on very large datasets but is fine for this scale.
+    if seen is None:
+        return query.order_by(func.random()).limit(limit).all()
+    candidates = query.order_by(func.random()).limit(limit * FRESH_OVERSAMPLE).all()
+    return prefer_unseen(candidates, seen, limit)
+
+def questions_by_ids(db: Session, question_ids: List[int]) -> List:
+    """
+    MCQ rows (MCQ_COLUMNS) for the given ids, in the order the ids were given.
+    Ids are never reused across banks, so this reads the snapshot they were taken from.
+    """
+    if not question_ids:
+        return []
+    rows = db.query(*MCQ_COLUMNS).filter(MCQ.id.in_(question_ids)).all()
+    by_id = {row[0]: row for row in rows}
+    return [by_id[qid] for qid in question_ids if qid in by_id]
+
+class AnswerKey(NamedTuple):
+    correct_answer: str
+    topic_id: Optional[int] # Chapter, or the subject when the question has no chapter
+    bank_id: Optional[int]
+
+# Cleared when the question bank is reseeded (bus key "questions")
+_answer_key_cache = LocalCache(cache_bus, "questions")
+
+_ANSWER_KEY_COLUMNS = (MCQ.id, MCQ.correct_answer, MCQ.topic_id, MCQ.subject_id, MCQ.bank_id)
+
+def _answer_key_map(rows) -> Dict[int, AnswerKey]:
+    return {
+        qid: AnswerKey(correct, topic_id or subject_id, bank_id)
+        for qid, correct, topic_id, subject_id, bank_id in rows
+    }
+
+def answer_keys(db: Session, question_ids: List[int]) -> Dict[int, AnswerKey]:
+    """Correct answer and topic per question id; cache misses are fetched in one IN query."""
+    keys = _answer_key_cache.get_many(question_ids)
+    missing = [qid for qid in question_ids if qid not in keys]
+    if missing:
+        generation = _answer_key_cache.generation
+        rows = db.query(*_ANSWER_KEY_COLUMNS).filter(MCQ.id.in_(missing)).all()
+        loaded = _answer_key_map(rows)
+        _answer_key_cache.set_many(loaded, generation)
+        keys.update(loaded)
+    return keys
+
+def warm_answer_keys(db: Session) -> int:
+    """Load the active bank's answer keys into the process cache (startup warm-up); returns how many."""
+    generation = _answer_key_cache.generation
+    rows = db.query(*_ANSWER_KEY_COLUMNS).filter(MCQ.bank_id == active_bank_id(db))\
+        .execution_options(yield_per=5000)
+    loaded = _answer_key_map(rows)
+    _answer_key_cache.set_many(loaded, generation)
+    return len(loaded)
+
+def pinned_bank_id(db: Session, keys: Dict[int, AnswerKey]) -> Optional[int]:
+    """Bank an attempt was taken against: that of its questions, else the active one."""
+    for key in keys.values():
+        if key.bank_id is not None:
+            return key.bank_id
+    return active_bank_id(db)
+
+def grade_answers(keys: Dict[int, AnswerKey], answers: Dict[int, str]) -> Dict[int, bool]:
+    """question id -> answered correctly, for questions that still exist."""
+    return {qid: keys[qid].correct_answer == selected for qid, selected in answers.items() if qid in keys}
@@ -0,0 +1,91 @@
+
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache_bus import cache_bus
+from app.core.jobs import job_queue
+from app.models.profile import UserProfile
+from app.models.result import UserResult, utcnow
+from app.utils.progress import update_progress
+from app.utils.questions import answer_keys, grade_answers, pinned_bank_id
+from app.utils.retention import user_average_accuracy
+from app.utils.seen_questions import mark_seen
+from app.utils.spaced_repetition import update_review_schedule
+from app.utils.subjects import subject_registry
+
+def record_result(
+    db: Session,
+    user_id: int,
+    subject: str,
+    score: int,
+    total_questions: int,
+    answers: Optional[Dict[int, str]],
+) -> UserResult:
+    """
+    Store a finished attempt, pinned to the question bank it was taken against. Only
+    the INSERT happens before the response; stats, review schedule and progress
+    rollups follow in the `process_result` job.
+    """
+    accuracy = 0
+    if total_questions > 0:
+        accuracy = (score / total_questions) * 100
+        
+    result = UserResult(
+        user_id=user_id,
+        subject=subject,
+        subject_id=subject_registry.resolve(db, subject),
+        # Answer keys are cached, and the job reuses them for grading
+        bank_id=pinned_bank_id(db, answer_keys(db, list(answers or {}))),
+        score=score,
+        total_questions=total_questions,
+        accuracy=accuracy,
+        answers=answers,
+        created_at=utcnow()
+    )
+    db.add(result)
+    db.flush()
+    # Detached before the commit so the caller reads the values just written
+    # instead of reloading the expired row
+    db.expunge(result)
+    db.commit()
+
+    # Keyed by user: one user's results fold into their rollups in order, never concurrently
+    job_queue.enqueue("process_result", {"result_id": result.id}, key=f"user:{user_id}")
+    return result
+
+@job_queue.handler("process_result")
+def process_result(db: Session, payload: dict) -> None:
+    """
+    Post-submit work for one result: profile stats, review schedule and progress rollups.
+    Runs at most once per result: the row is locked and processed_at is set in the same
+    transaction as every update below, so a redelivered job finds it done and does nothing.
+    """
+    result = db.query(UserResult).filter(UserResult.id == payload["result_id"]).with_for_update().first()
+    if result is None or result.processed_at is not None:
+        return
+    result.processed_at = utcnow()
+    # JSON round-trips turn the question ids into strings
+    answers = {int(qid): selected for qid, selected in (result.answers or {}).items()}
+
+    keys = answer_keys(db, list(answers))
+    graded = grade_answers(keys, answers)
+    # Missed questions join the review queue; correct ones advance items already in it
+    update_review_schedule(db, result.user_id, graded)
+    # Remembered so "fresh" sampling can prefer questions the user has not answered recently
+    mark_seen(db, result.user_id, result.subject_id, graded)
+    update_progress(
+        db, result.user_id, result.subject, result.score, result.total_questions, result.accuracy, graded,
+        topics={qid: key.topic_id for qid, key in keys.items()},
+        when=result.created_at
+    )
+
+    # Update profile stats
+    profile = db.query(UserProfile).filter(UserProfile.user_id == result.user_id).first()
+    if profile:
+        profile.tests_taken += 1
+        # Rollups cover compacted months; only partitions after the watermark are scanned
+        avg = user_average_accuracy(db, result.user_id)
+        # avg_accuracy is an Integer column
+        profile.avg_accuracy = round(avg if avg is not None else result.accuracy)
+        cache_bus.publish(db, f"profile:{result.user_id}")
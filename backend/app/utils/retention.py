@@ -0,0 +1,163 @@
+"""
+Retention for `user_results`.
+
+`compact_results` walks closed months older than RESULT_RETENTION_MONTHS. It folds
+each month into `user_result_rollups` (attempts and score sums per subject) and
+`user_topic_rollups` (answered / correct per topic, graded from the blobs), then drops
+the per-question `answers` blobs. The result rows themselves stay, so history still
+lists them; only the heavy JSON goes away.
+
+Compaction cannot be undone. For a compacted month, `/assessment/result/{id}` lists
+no questions, per-question review of those attempts is gone, and topic accuracy can
+only be recomputed from `user_topic_rollups`, not per question or per attempt.
+
+The rollups form a watermark: every month before it is fully summarised, so averages
+read the rollups plus only the live rows from the watermark on. On PostgreSQL that
+`created_at >= watermark` filter prunes the scan to the recent partitions.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, null, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.jobs import job_queue
+from app.db.session import engine
+from app.db.partitioning import add_months, ensure_result_partitions, month_start
+from app.models.result import UserResult
+from app.models.result_rollup import UserResultRollup, UserTopicRollup
+from app.utils.questions import answer_keys, grade_answers
+
+logger = logging.getLogger(__name__)
+
+# Answer blobs graded per batch while compacting a month
+TOPIC_BATCH_SIZE = 1000
+
+
+@job_queue.periodic(60 * 60)
+def maintain_result_partitions() -> None:
+    """Keep months_ahead partitions ahead of time even if nothing restarts or compacts."""
+    ensure_result_partitions(engine)
+
+
+def rollup_watermark(db: Session) -> Optional[date]:
+    """First month not covered by rollups, or None when nothing was compacted yet."""
+    last_month = db.query(func.max(UserResultRollup.month)).scalar()
+    return add_months(last_month, 1) if last_month else None
+
+
+def user_average_accuracy(db: Session, user_id: int) -> Optional[float]:
+    """Average accuracy across all of a user's attempts, compacted or not."""
+    watermark = rollup_watermark(db)
+
+    live = db.query(func.count(UserResult.id), func.sum(UserResult.accuracy))\
+        .filter(UserResult.user_id == user_id)
+    if watermark:
+        live = live.filter(UserResult.created_at >= watermark)
+    attempts, accuracy_sum = live.one()
+
+    if watermark:
+        rolled_attempts, rolled_sum = db.query(
+            func.sum(UserResultRollup.attempts), func.sum(UserResultRollup.accuracy_sum)
+        ).filter(UserResultRollup.user_id == user_id).one()
+        attempts += rolled_attempts or 0
+        accuracy_sum = (accuracy_sum or 0) + (rolled_sum or 0)
+
+    if not attempts:
+        return None
+    return accuracy_sum / attempts
+
+
+def _fold_topics(db: Session, month: date, in_month) -> None:
+    """Add the month's remaining answer blobs to its topic rollups (caller strips them in the same transaction)."""
+    counts = defaultdict(lambda: [0, 0])
+    rows = db.execute(
+        select(UserResult.user_id, UserResult.answers)
+        .where(*in_month, UserResult.answers.isnot(None))
+        .execution_options(yield_per=TOPIC_BATCH_SIZE)
+    )
+    for batch in rows.partitions():
+        # Blobs compacted before SQL NULL was written hold a JSON null instead
+        answers = [(user_id, {int(qid): selected for qid, selected in blob.items()})
+                   for user_id, blob in batch if blob]
+        keys = answer_keys(db, list({qid for _, blob in answers for qid in blob}))
+        for user_id, blob in answers:
+            for qid, correct in grade_answers(keys, blob).items():
+                entry = counts[(user_id, keys[qid].topic_id)]
+                entry[0] += 1
+                entry[1] += correct
+
+    existing = {
+        (rollup.user_id, rollup.topic_id): rollup
+        for rollup in db.query(UserTopicRollup).filter(UserTopicRollup.month == month)
+    }
+    for (user_id, topic_id), (answered, correct) in counts.items():
+        if topic_id is None:
+            continue
+        rollup = existing.get((user_id, topic_id))
+        if rollup is None:
+            db.add(UserTopicRollup(user_id=user_id, topic_id=topic_id, month=month, answered=answered, correct=correct))
+        else:
+            # Blobs are counted once: only rows that still have one are read, and they are stripped with this
+            rollup.answered += answered
+            rollup.correct += correct
+
+
+def compact_month(db: Session, month: date) -> int:
+    """Rebuild the rollups for one month and strip its answer blobs. Idempotent."""
+    lower, upper = month, add_months(month, 1)
+    in_month = (UserResult.created_at >= lower, UserResult.created_at < upper)
+    _fold_topics(db, month, in_month)
+
+    totals = db.query(
+        UserResult.user_id,
+        UserResult.subject,
+        func.count(UserResult.id),
+        func.sum(UserResult.score),
+        func.sum(UserResult.total_questions),
+        func.sum(UserResult.accuracy),
+    ).filter(*in_month).group_by(UserResult.user_id, UserResult.subject).all()
+
+    db.query(UserResultRollup).filter(UserResultRollup.month == month).delete(synchronize_session=False)
+    db.bulk_save_objects([
+        UserResultRollup(
+            user_id=user_id,
+            subject=subject,
+            month=month,
+            attempts=attempts,
+            score_sum=score_sum or 0,
+            questions_sum=questions_sum or 0,
+            accuracy_sum=accuracy_sum or 0,
+        )
+        for user_id, subject, attempts, score_sum, questions_sum, accuracy_sum in totals
+    ])
+    db.query(UserResult)\
+        .filter(*in_month, UserResult.answers.isnot(None))\
+        .update({UserResult.answers: null()}, synchronize_session=False)  # SQL NULL, not JSON null
+    db.commit()
+    return len(totals)
+
+
+def compact_results(db: Session, keep_months: Optional[int] = None) -> dict:
+    """Compact every month older than the retention window, oldest first."""
+    keep_months = settings.RESULT_RETENTION_MONTHS if keep_months is None else keep_months
+    ensure_result_partitions(db.get_bind())
+
+    cutoff = add_months(month_start(datetime.now(timezone.utc)), -keep_months)
+    month = rollup_watermark(db)
+    if month is None:
+        oldest = db.query(func.min(UserResult.created_at)).scalar()
+        if oldest is None:
+            return {"months": 0, "rollups": 0}
+        month = month_start(oldest)
+
+    months = rollups = 0
+    while month < cutoff:
+        rollups += compact_month(db, month)
+        logger.info(f"Compacted user_results for {month:%Y-%m}")
+        months += 1
+        month = add_months(month, 1)
+    return {"months": months, "rollups": rollups}
@@ -4,36 +4,38 @@ import csv
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.models.mcq import MCQ
+from app.core.cache_bus import cache_bus
+from app.utils.question_banks import activate_bank, active_bank_id, create_bank, discard_bank, ensure_legacy_bank
+from app.utils.subjects import SUBJECT_MAP, ensure_subjects, ensure_chapter
+
+# Questions per committed batch while loading a staging bank
+BATCH_SIZE = 1000
 
 def seed_mcqs_from_csv(db: Session, force: bool = False):
+    """
+    Load the CSV into a new question bank and activate it. With force, an existing
+    bank is superseded rather than dropped: its questions stay for results that use them.
+    """
     if db.query(MCQ).count() > 0 and not force:
-        return {"message": "Data already exists", "count": db.query(MCQ).count()}
-    
-    if force:
+        # Still make sure older rows are linked to the subjects table and a bank
+        ensure_subjects(db)
+        ensure_legacy_bank(db)
+        cache_bus.publish(db, "subjects")
         db.commit()
-        MCQ.__table__.drop(db.get_bind(), checkfirst=True)
-        MCQ.__table__.create(db.get_bind(), checkfirst=True)
+        count = db.query(MCQ).filter(MCQ.bank_id == active_bank_id(db)).count()
+        return {"message": "Data already exists", "count": count}
 
     file_path = os.path.abspath("mcqs_data/questions_data.csv")
     
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail=f"CSV file not found at {file_path}")
 
-    SUBJECT_MAP = {
-        "Fundamental Programming": "fp",
-        "Data Structure": "ds",
-        "Database System": "db",
-        "Computer Network": "cn",
-        "Software Engineering": "se",
-        "Operating System": "os",
-        "Object Oriented Programming": "oop",
-         "Discrete Structure": "disc",
-        "Information Security": "infosec"
-    }
-
+    bank = create_bank(db, source=os.path.basename(file_path))
     mock_data = []
+    loaded = 0
     
     try:
+        subject_ids = ensure_subjects(db)
         with open(file_path, mode='r', encoding='utf-8') as file:
             reader = csv.reader(file)
             for row in reader:
@@ -48,6 +50,9 @@ def seed_mcqs_from_csv(db: Session, force: bool = False):
                      elif "Data Structure" in subj_name: subj_id = "ds"
                      else: continue 
 
+                chapter = row[2].strip()
+                topic_id = ensure_chapter(db, subject_ids, subj_id, chapter) if chapter else None
+
                 q_text = row[3]
                 opts = [row[4], row[5], row[6], row[7]]
                 explanation = row[9] # Explanation column
@@ -66,7 +71,10 @@ def seed_mcqs_from_csv(db: Session, force: bool = False):
                 elif "hard" in diff_str: diff_lvl = 3
                 
                 mcq = MCQ(
+                    bank_id=bank.id,
                     subject=subj_id,
+                    subject_id=subject_ids[subj_id],
+                    topic_id=topic_id,
                     difficulty_level=diff_lvl,
                     question=q_text,
                     option_a=opts[0],
@@ -77,10 +85,20 @@ def seed_mcqs_from_csv(db: Session, force: bool = False):
                     explanation=explanation
                 )
                 mock_data.append(mcq)
+                if len(mock_data) >= BATCH_SIZE:
+                    # Short transactions: the active bank keeps serving while this one loads
+                    db.bulk_save_objects(mock_data)
+                    db.commit()
+                    loaded += len(mock_data)
+                    mock_data = []
                 
         db.bulk_save_objects(mock_data)
+        loaded += len(mock_data)
+        cache_bus.publish(db, "subjects")
         db.commit()
-        return {"message": "Data seeded successfully", "count": len(mock_data)}
+        activate_bank(db, bank)
+        return {"message": "Data seeded successfully", "count": loaded, "bank_id": bank.id}
     except Exception as e:
         db.rollback()
+        discard_bank(db, bank.id)
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,103 @@
+"""
+Per-user memory of recently shown questions, for "fresh questions first" sampling.
+
+Each (user, subject) pair keeps two Bloom filters over MCQ ids, 512 bytes each: the
+generation being filled and the one before it. Answered ids are added after every submit.
+Once the current generation holds GENERATION_SIZE ids it becomes the previous one and an
+empty filter takes its place. The memory therefore covers roughly the last 300-600
+questions seen in that subject, in 1 KB, whatever the size of the bank.
+
+A Bloom filter never forgets an id it holds. At capacity about 1% of unseen ids test as
+seen, which only makes them a little less likely to be picked.
+"""
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.models.seen_questions import SeenQuestions
+from app.utils.subjects import subject_registry
+
+FILTER_BYTES = 512
+FILTER_BITS = FILTER_BYTES * 8
+HASHES = 3
+GENERATION_SIZE = 300
+# Random candidates drawn per requested question when preferring unseen ones
+FRESH_OVERSAMPLE = 4
+
+_MASK64 = (1 << 64) - 1
+
+def _mix(x: int) -> int:
+    # splitmix64 finaliser: sequential ids spread evenly over the filter
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+def _positions(question_id: int) -> List[int]:
+    # Double hashing: HASHES bit positions from one 64-bit hash
+    h = _mix(question_id)
+    h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+    return [(h1 + i * h2) % FILTER_BITS for i in range(HASHES)]
+
+def _test(bits: bytes, question_id: int) -> bool:
+    return all(bits[p >> 3] & (1 << (p & 7)) for p in _positions(question_id))
+
+def _add(bits: bytearray, question_id: int) -> None:
+    for p in _positions(question_id):
+        bits[p >> 3] |= 1 << (p & 7)
+
+
+class SeenFilter:
+    """Read-only view of one user's filters for one subject."""
+
+    def __init__(self, current: bytes, previous: Optional[bytes] = None):
+        self.current = current
+        self.previous = previous
+
+    def __contains__(self, question_id: int) -> bool:
+        return _test(self.current, question_id) or (self.previous is not None and _test(self.previous, question_id))
+
+
+def load_seen(db: Session, user_id: int, subject_id: Optional[int]) -> Optional[SeenFilter]:
+    """The user's filter for subject_id, or None if they have not been shown any of it yet."""
+    if subject_id is None:
+        return None
+    row = db.query(SeenQuestions.current, SeenQuestions.previous).filter(
+        SeenQuestions.user_id == user_id,
+        SeenQuestions.subject_id == subject_id
+    ).first()
+    return SeenFilter(row.current, row.previous) if row else None
+
+def seen_for_subject(db: Session, user_id: int, subject: str) -> Optional[SeenFilter]:
+    """load_seen by subject code; filters are per top-level subject even when sampling a chapter."""
+    return load_seen(db, user_id, subject_registry.resolve(db, subject))
+
+def mark_seen(db: Session, user_id: int, subject_id: Optional[int], question_ids: Iterable[int]) -> None:
+    """Add question ids to the user's filter for subject_id, rotating generations when full (caller commits)."""
+    if subject_id is None:
+        return
+    row = db.query(SeenQuestions).filter(
+        SeenQuestions.user_id == user_id,
+        SeenQuestions.subject_id == subject_id
+    ).first()
+    if row is None:
+        row = SeenQuestions(user_id=user_id, subject_id=subject_id, current=bytes(FILTER_BYTES), current_count=0)
+        db.add(row)
+
+    bits, count = bytearray(row.current), row.current_count
+    for qid in question_ids:
+        if _test(bits, qid):
+            continue
+        if count >= GENERATION_SIZE:
+            row.previous = bytes(bits)
+            bits, count = bytearray(FILTER_BYTES), 0
+        _add(bits, qid)
+        count += 1
+    row.current, row.current_count = bytes(bits), count
+
+def prefer_unseen(rows: Sequence, seen: SeenFilter, limit: int) -> List:
+    """Up to limit rows (id first), unseen ones before seen ones, order otherwise kept."""
+    fresh = [row for row in rows if row[0] not in seen]
+    if len(fresh) >= limit:
+        return fresh[:limit]
+    return fresh + [row for row in rows if row[0] in seen][:limit - len(fresh)]
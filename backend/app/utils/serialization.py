@@ -0,0 +1,75 @@
+
+from typing import Any, Iterable, List
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from app.models.mcq import MCQ
+from app.models.result import UserResult
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    Endpoints returning this directly skip FastAPI's response_model validation,
+    so the content must already match the declared schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Column tuples for the fast paths: selecting plain columns avoids building
+# ORM instances (identity map, attribute instrumentation) for every row.
+MCQ_COLUMNS = (
+    MCQ.id,
+    MCQ.subject,
+    MCQ.difficulty_level,
+    MCQ.question,
+    MCQ.option_a,
+    MCQ.option_b,
+    MCQ.option_c,
+    MCQ.option_d,
+    MCQ.correct_answer,
+    MCQ.explanation,
+)
+
+HISTORY_COLUMNS = (
+    UserResult.id,
+    UserResult.subject,
+    UserResult.score,
+    UserResult.total_questions,
+    UserResult.accuracy,
+    UserResult.created_at,
+)
+
+
+def mcq_rows_to_dicts(rows: Iterable) -> List[dict]:
+    """Map rows selected with MCQ_COLUMNS to the `schemas.mcq.MCQ` shape."""
+    return [
+        {
+            "id": r[0],
+            "subject": r[1],
+            "difficulty_level": r[2],
+            "question": r[3],
+            "options": [r[4], r[5], r[6], r[7]],
+            "correct_answer": r[8],
+            "explanation": r[9],
+        }
+        for r in rows
+    ]
+
+
+def history_rows_to_dicts(rows: Iterable) -> List[dict]:
+    """Map rows selected with HISTORY_COLUMNS to the `schemas.profile.UserHistoryItem` shape."""
+    return [
+        {
+            "id": r[0],
+            "subject": r[1],
+            "score": r[2],
+            "total_questions": r[3],
+            "accuracy": float(r[4]),
+            "created_at": r[5],
+        }
+        for r in rows
+    ]
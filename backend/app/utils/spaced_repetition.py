@@ -0,0 +1,64 @@
+"""
+SM-2 scheduling for the review queue.
+
+Multiple-choice answers are binary, so they map onto two SM-2 grades: a miss is
+quality 1 (reset to a one-day interval) and a correct answer is quality 4.
+Only missed questions enter the queue; correct answers advance items already in it.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.review import ReviewItem
+
+QUALITY_WRONG = 1
+QUALITY_CORRECT = 4
+MIN_EASE = 1.3
+
+def sm2(repetitions: int, interval_days: int, ease_factor: float, quality: int) -> Tuple[int, int, float]:
+    """Next (repetitions, interval_days, ease_factor) after a review graded 0-5."""
+    ease_factor = max(MIN_EASE, ease_factor + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < 3:
+        return 0, 1, ease_factor
+    if repetitions == 0:
+        interval_days = 1
+    elif repetitions == 1:
+        interval_days = 6
+    else:
+        interval_days = round(interval_days * ease_factor)
+    return repetitions + 1, interval_days, ease_factor
+
+def update_review_schedule(db: Session, user_id: int, graded: Dict[int, bool]) -> None:
+    """
+    Apply one round of answers to the user's schedule (caller commits).
+    Touches only the answered questions: one IN lookup, then inserts/updates.
+    """
+    if not graded:
+        return
+    now = datetime.now(timezone.utc)
+    items = {
+        item.mcq_id: item
+        for item in db.query(ReviewItem).filter(
+            ReviewItem.user_id == user_id,
+            ReviewItem.mcq_id.in_(list(graded))
+        )
+    }
+
+    for mcq_id, is_correct in graded.items():
+        item = items.get(mcq_id)
+        if item is None:
+            if is_correct:
+                continue
+            item = ReviewItem(user_id=user_id, mcq_id=mcq_id, repetitions=0, interval_days=0,
+                              ease_factor=2.5, lapses=0)
+            db.add(item)
+
+        quality = QUALITY_CORRECT if is_correct else QUALITY_WRONG
+        item.repetitions, item.interval_days, item.ease_factor = sm2(
+            item.repetitions, item.interval_days, item.ease_factor, quality
+        )
+        if not is_correct:
+            item.lapses += 1
+        item.due_at = now + timedelta(days=item.interval_days)
+        item.last_reviewed_at = now
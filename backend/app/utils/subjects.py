@@ -0,0 +1,98 @@
+
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache_bus import cache_bus
+from app.models.mcq import MCQ
+from app.models.result import UserResult
+from app.models.subject import Subject
+
+# CSV subject names -> subject codes used throughout the API
+SUBJECT_MAP = {
+    "Fundamental Programming": "fp",
+    "Data Structure": "ds",
+    "Database System": "db",
+    "Computer Network": "cn",
+    "Software Engineering": "se",
+    "Operating System": "os",
+    "Object Oriented Programming": "oop",
+    "Discrete Structure": "disc",
+    "Information Security": "infosec"
+}
+
+def chapter_code(subject_code: str, chapter: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", chapter.lower()).strip("-")
+    return f"{subject_code}.{slug}"
+
+
+class SubjectRegistry:
+    """
+    Process-wide code -> id map for the subjects table (subjects and chapters).
+    Lookups are dictionary hits; the table is re-read only after invalidate() or,
+    for an unknown code, at most once per RELOAD_INTERVAL seconds.
+    """
+
+    RELOAD_INTERVAL = 60
+
+    def __init__(self):
+        self._ids: Optional[Dict[str, int]] = None
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session) -> Dict[str, int]:
+        ids = {code: sid for code, sid in db.query(Subject.code, Subject.id)}
+        with self._lock:
+            self._ids = ids
+            self._loaded_at = time.monotonic()
+        return ids
+
+    def resolve(self, db: Session, code: str) -> Optional[int]:
+        code = code.strip().lower()
+        ids = self._ids if self._ids is not None else self._load(db)
+        if code not in ids and time.monotonic() - self._loaded_at > self.RELOAD_INTERVAL:
+            ids = self._load(db)
+        return ids.get(code)
+
+    def warm(self, db: Session) -> None:
+        self._load(db)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._ids = None
+
+
+subject_registry = SubjectRegistry()
+cache_bus.subscribe("subjects", lambda key, version: subject_registry.invalidate())
+
+
+def ensure_subjects(db: Session) -> Dict[str, int]:
+    """Create missing top-level subjects and link MCQs and results that predate the taxonomy (caller commits)."""
+    existing = {code: sid for code, sid in db.query(Subject.code, Subject.id)}
+    for name, code in SUBJECT_MAP.items():
+        if code not in existing:
+            subject = Subject(code=code, name=name)
+            db.add(subject)
+            db.flush()
+            existing[code] = subject.id
+
+    for model in (MCQ, UserResult):
+        # Unknown codes stay NULL; the IN keeps them from being rewritten on every startup
+        subject_id = select(Subject.id).where(Subject.code == model.subject).scalar_subquery()
+        db.query(model).filter(model.subject_id.is_(None), model.subject.in_(list(existing)))\
+            .update({model.subject_id: subject_id}, synchronize_session=False)
+    return existing
+
+def ensure_chapter(db: Session, codes: Dict[str, int], subject_code: str, chapter: str) -> int:
+    """Id of the chapter under subject_code, creating it on first sight (caller commits)."""
+    code = chapter_code(subject_code, chapter)
+    if code not in codes:
+        subject = Subject(code=code, name=chapter, parent_id=codes[subject_code])
+        db.add(subject)
+        db.flush()
+        codes[code] = subject.id
+    return codes[code]
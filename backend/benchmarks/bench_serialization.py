@@ -0,0 +1,88 @@
+"""
+Micro-benchmark: ORM + Pydantic response_model path vs. the column/orjson fast path.
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py --rows 100 --repeat 200
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.mcq import MCQ
+from app.schemas.mcq import MCQ as MCQSchema
+from app.utils.serialization import ORJSONResponse, MCQ_COLUMNS, mcq_rows_to_dicts
+
+
+def build_session(rows: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine, tables=[MCQ.__table__])
+    db = sessionmaker(bind=engine)()
+    db.bulk_save_objects([
+        MCQ(
+            subject="ds",
+            difficulty_level=(i % 3) + 1,
+            question=f"Question {i}: which structure gives O(1) average lookup?",
+            option_a="Hash table",
+            option_b="Linked list",
+            option_c="Binary heap",
+            option_d="Stack",
+            correct_answer="Hash table",
+            explanation="Hash tables map keys to buckets directly.",
+        )
+        for i in range(rows)
+    ])
+    db.commit()
+    return db
+
+
+def orm_path(db, adapter: TypeAdapter) -> bytes:
+    objs = db.query(MCQ).all()
+    validated = adapter.validate_python(objs, from_attributes=True)
+    body = adapter.dump_json(validated)
+    # Drop the identity map so every iteration pays for fresh ORM instances, as a request does.
+    db.expunge_all()
+    return body
+
+
+def fast_path(db) -> bytes:
+    rows = db.query(*MCQ_COLUMNS).all()
+    return ORJSONResponse(mcq_rows_to_dicts(rows)).body
+
+
+def timeit(fn, repeat: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    db = build_session(args.rows)
+    adapter = TypeAdapter(List[MCQSchema])
+
+    orm = timeit(lambda: orm_path(db, adapter), args.repeat)
+    fast = timeit(lambda: fast_path(db), args.repeat)
+
+    print(f"rows={args.rows} repeat={args.repeat}")
+    print(f"orm + pydantic  : {orm * 1e3:8.3f} ms/request  {orm / args.rows * 1e6:7.2f} us/row")
+    print(f"columns + orjson: {fast * 1e3:8.3f} ms/request  {fast / args.rows * 1e6:7.2f} us/row")
+    print(f"speedup         : {orm / fast:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
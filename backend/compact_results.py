@@ -0,0 +1,24 @@
+
+import argparse
+import sys
+import os
+
+# Add the current directory to sys.path so we can import app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.session import SessionLocal
+from app.utils.retention import compact_results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact old user_results answers into monthly rollups.")
+    parser.add_argument("--keep-months", type=int, default=None,
+                        help="Months of full answer history to keep (default: RESULT_RETENTION_MONTHS)")
+    args = parser.parse_args()
+
+    print("Compacting old results...")
+    db = SessionLocal()
+    try:
+        summary = compact_results(db, keep_months=args.keep_months)
+    finally:
+        db.close()
+    print(f"Done. Compacted {summary['months']} month(s) into {summary['rollups']} rollup row(s).")
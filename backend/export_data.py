@@ -0,0 +1,45 @@
+
+import argparse
+import sys
+import os
+from datetime import datetime
+
+# Add the current directory to sys.path so we can import app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.session import read_router
+from app.utils.export import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    export_chunks,
+    export_filename,
+    export_watermark,
+    parquet_available
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream user_results / mcq to gzip CSV or Parquet.")
+    parser.add_argument("dataset", choices=sorted(EXPORT_COLUMNS))
+    parser.add_argument("--format", dest="fmt", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--since-id", type=int, default=None, help="Watermark printed by the previous run")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None,
+                        help="Only results created at or after this ISO timestamp")
+    parser.add_argument("--output", default=None, help="Output file (default: <dataset>.csv.gz / .parquet)")
+    args = parser.parse_args()
+
+    if args.since is not None and args.dataset != "results":
+        parser.error("--since only applies to the results dataset")
+    if args.fmt == "parquet" and not parquet_available():
+        sys.exit("Parquet export requires the 'pyarrow' package")
+
+    output = args.output or export_filename(args.dataset, args.fmt)
+    db = read_router.session()
+    try:
+        watermark = max(export_watermark(db, args.dataset) or 0, args.since_id or 0)
+        with open(output, "wb") as f:
+            for chunk in export_chunks(db, args.dataset, args.fmt, watermark,
+                                       since_id=args.since_id, since=args.since):
+                f.write(chunk)
+    finally:
+        db.close()
+    print(f"Exported {args.dataset} to {output}. Next run: --since-id {watermark}")
@@ -0,0 +1,488 @@
+"""
+Synthetic dataset factory and in-process load generator, for capacity planning.
+
+    # 50k users, 2k questions per subject, ~12 results per active user over 6 months
+    python loadgen.py dataset --users 50000 --questions-per-subject 2000 --results-per-user 12
+
+    # Replay the default exam-day mix (or --mix mix.json / --mix-from-log access.log)
+    python loadgen.py replay --requests 5000 --concurrency 64
+
+`dataset` is reproducible for a given --seed and appends to whatever is already in the
+database. Rows go in through Core executemany batches, or COPY on PostgreSQL. Only the
+source tables are generated (users, profiles, questions, results). Review schedules,
+progress rollups and seen-question filters are built by the post-submit job, so they fill
+in as `replay` submits.
+
+`replay` drives the ASGI app in this process with httpx, one event loop like a single
+worker, lifespan included. It reports latency percentiles per endpoint and how long the
+post-submit jobs took to drain. Run it once per core count and worker setting you want to
+size for.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+# Add the current directory to sys.path so we can import app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, insert
+
+EMAIL_DOMAIN = "loadgen.test"
+PASSWORD = "loadgen"
+CHAPTERS_PER_SUBJECT = 12
+DIFFICULTY_WEIGHTS = [0.4, 0.4, 0.2] # Easy / Medium / Hard
+TEST_SIZES, TEST_SIZE_WEIGHTS = [10, 20, 25, 50], [0.4, 0.3, 0.2, 0.1]
+# Share of signed-up users who never finish a test
+INACTIVE_SHARE = 0.2
+# Attempts per hour of day (UTC), evening-heavy like the production access logs
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 4, 5, 6, 6, 6, 6, 6, 6, 7, 8, 9, 10, 10, 9, 7, 4, 2]
+
+# Exam-day traffic: mostly taking tests, with dashboards in between
+DEFAULT_MIX = {
+    "questions": 25, "submit": 8, "exam": 15, "overview": 10, "home_stats": 10,
+    "history": 10, "progress": 8, "profile": 8, "result": 6,
+}
+# Access log request line -> scenario, for --mix-from-log
+LOG_ROUTES = [
+    ("submit", "POST", re.compile(r"^/api/v1/assessment/submit\b")),
+    ("exam", "POST", re.compile(r"^/api/v1/assessment/session/?(\?|$)")),
+    ("questions", "GET", re.compile(r"^/api/v1/assessment/questions\b")),
+    ("overview", "GET", re.compile(r"^/api/v1/assessment/overview\b")),
+    ("result", "GET", re.compile(r"^/api/v1/assessment/result/\d+")),
+    ("home_stats", "GET", re.compile(r"^/api/v1/home/stats\b")),
+    ("history", "GET", re.compile(r"^/api/v1/profile/history\b")),
+    ("progress", "GET", re.compile(r"^/api/v1/profile/progress\b")),
+    ("profile", "GET", re.compile(r"^/api/v1/profile/me\b")),
+]
+_LOG_REQUEST = re.compile(r'"(GET|POST|PUT|PATCH|DELETE) (\S+) HTTP/[\d.]+"')
+
+
+# --- dataset ---------------------------------------------------------------
+
+def copy_rows(db, table, rows) -> None:
+    """COPY rows (dicts with the same keys) into table over the session's connection."""
+    # COPY skips the model's Python-side defaults (e.g. a profile's title), so fill them in
+    defaults = {
+        column.name: column.default.arg for column in table.columns
+        if column.name not in rows[0] and column.default is not None and column.default.is_scalar
+    }
+    columns = list(rows[0]) + list(defaults)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([
+            r"\N" if value is None
+            else json.dumps(value) if isinstance(value, (dict, list))
+            else ("t" if value else "f") if isinstance(value, bool)
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in (row.get(c, defaults.get(c)) for c in columns)
+        ])
+    buf.seek(0)
+    with db.connection().connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf
+        )
+
+def bulk_load(db, model, rows, method: str) -> None:
+    """Insert one batch and commit it, so a long load never holds one huge transaction."""
+    if not rows:
+        return
+    if method == "copy":
+        copy_rows(db, model.__table__, rows)
+    else:
+        db.execute(insert(model), rows)
+    db.commit()
+
+def subject_weights(rng: random.Random, codes) -> dict:
+    """Zipf-like popularity over a seeded ordering of the subjects."""
+    ordered = list(codes)
+    rng.shuffle(ordered)
+    return {code: 1 / (rank + 1) for rank, code in enumerate(ordered)}
+
+def result_count(rng: random.Random, median: float) -> int:
+    """Attempts per user: a fifth never test, the rest log-normal around median (long tail)."""
+    if median <= 0 or rng.random() < INACTIVE_SHARE:
+        return 0
+    return max(1, min(int(round(rng.lognormvariate(math.log(median), 1.0))), int(median * 50)))
+
+def attempt_times(rng: random.Random, count: int, now: datetime, months: int):
+    """count timestamps within the last months, biased towards recent weeks, oldest first."""
+    window_days = months * 30
+    times = []
+    for _ in range(count):
+        day = now - timedelta(days=int(window_days * rng.random() ** 1.5))
+        hour = rng.choices(range(24), HOUR_WEIGHTS)[0]
+        times.append(min(day.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60)), now))
+    return sorted(times)
+
+def generate_questions(db, rng, per_subject: int, batch_size: int, method: str):
+    from app.core.cache_bus import cache_bus
+    from app.models.mcq import MCQ
+    from app.utils.question_banks import activate_bank, create_bank
+    from app.utils.subjects import SUBJECT_MAP, ensure_chapter, ensure_subjects
+
+    subject_ids = ensure_subjects(db)
+    chapters = {
+        code: [ensure_chapter(db, subject_ids, code, f"Chapter {n + 1}") for n in range(CHAPTERS_PER_SUBJECT)]
+        for code in SUBJECT_MAP.values()
+    }
+    cache_bus.publish(db, "subjects")
+    db.commit()
+
+    bank = create_bank(db, source="loadgen")
+    batch = []
+    for code in SUBJECT_MAP.values():
+        for n in range(per_subject):
+            options = [f"{code} option {n}.{k}" for k in range(4)]
+            batch.append({
+                "bank_id": bank.id, "subject": code, "subject_id": subject_ids[code],
+                "topic_id": rng.choice(chapters[code]),
+                "difficulty_level": rng.choices([1, 2, 3], DIFFICULTY_WEIGHTS)[0],
+                "question": f"Synthetic {code} question {n}: which option is correct?",
+                "option_a": options[0], "option_b": options[1], "option_c": options[2], "option_d": options[3],
+                "correct_answer": rng.choice(options), "explanation": f"Explanation for {code} question {n}.",
+            })
+            if len(batch) >= batch_size:
+                bulk_load(db, MCQ, batch, method)
+                batch = []
+    bulk_load(db, MCQ, batch, method)
+    activate_bank(db, bank)
+    return bank
+
+def generate_dataset(db, args) -> None:
+    from app.core.cache_bus import cache_bus
+    from app.core.security import get_password_hash
+    from app.models.mcq import MCQ
+    from app.models.profile import UserProfile
+    from app.models.result import UserResult
+    from app.models.user import User
+    from app.utils.question_banks import active_bank_id
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    started = time.monotonic()
+
+    if args.questions_per_subject:
+        bank = generate_questions(db, rng, args.questions_per_subject, args.batch_size, args.method)
+        bank_id = bank.id
+        print(f"Questions: {bank.question_count} in bank {bank_id} ({time.monotonic() - started:.1f}s)")
+    else:
+        bank_id = active_bank_id(db)
+        if bank_id is None:
+            sys.exit("No active question bank; pass --questions-per-subject or seed the CSV first")
+
+    # Question pool per subject: (id, difficulty, correct answer, one wrong option)
+    pool = defaultdict(list)
+    for qid, code, subject_id, level, correct, option_a, option_b in db.query(
+            MCQ.id, MCQ.subject, MCQ.subject_id, MCQ.difficulty_level, MCQ.correct_answer,
+            MCQ.option_a, MCQ.option_b).filter(MCQ.bank_id == bank_id):
+        pool[(code, subject_id)].append((qid, level or 2, correct, option_b if correct == option_a else option_a))
+    subjects = list(pool)
+    weights = subject_weights(rng, subjects)
+
+    # Users continue numbering after an earlier run, so runs can be stacked
+    offset = db.query(func.count(User.id)).filter(User.email.like(f"%@{EMAIL_DOMAIN}")).scalar()
+    hashed = get_password_hash(PASSWORD)
+    users_started = time.monotonic()
+    for start in range(0, args.users, args.batch_size):
+        bulk_load(db, User, [
+            {"email": f"user{offset + n}@{EMAIL_DOMAIN}", "full_name": f"Load User {offset + n}",
+             "hashed_password": hashed, "provider": "local", "is_active": True}
+            for n in range(start, min(start + args.batch_size, args.users))
+        ], args.method)
+    user_ids = [uid for (uid,) in db.query(User.id).filter(User.email.like(f"%@{EMAIL_DOMAIN}"))
+                .order_by(User.id).offset(offset)]
+    print(f"Users: {len(user_ids)} ({time.monotonic() - users_started:.1f}s)")
+
+    results_started = time.monotonic()
+    profiles, results, total_results = [], [], 0
+    for user_id in user_ids:
+        skill = rng.betavariate(5, 3)
+        # Each user sticks to a few subjects, drawn by popularity
+        favourites = list(dict.fromkeys(rng.choices(subjects, [weights[s] for s in subjects], k=3)))
+        attempts = attempt_times(rng, result_count(rng, args.results_per_user), now, args.months)
+        accuracies = []
+        for n, created_at in enumerate(attempts):
+            code, subject_id = rng.choice(favourites)
+            questions = pool[(code, subject_id)]
+            size = min(rng.choices(TEST_SIZES, TEST_SIZE_WEIGHTS)[0], len(questions))
+            # Harder questions cost accuracy; practice slowly earns it back
+            answers, score = {}, 0
+            for qid, level, correct, wrong in rng.sample(questions, size):
+                p = min(max(skill - 0.12 * (level - 2) + 0.004 * n, 0.05), 0.98)
+                right = rng.random() < p
+                answers[str(qid)] = correct if right else wrong
+                score += right
+            accuracy = score / size * 100 if size else 0
+            accuracies.append(accuracy)
+            results.append({
+                "user_id": user_id, "subject": code, "subject_id": subject_id, "bank_id": bank_id,
+                "score": score, "total_questions": size, "accuracy": accuracy,
+                "answers": answers, "created_at": created_at,
+            })
+        profiles.append({
+            "user_id": user_id,
+            "tests_taken": len(accuracies),
+            "avg_accuracy": int(sum(accuracies) / len(accuracies)) if accuracies else 0,
+            "subjects_interested": json.dumps([code for code, _ in favourites]),
+        })
+        if len(results) >= args.batch_size:
+            bulk_load(db, UserResult, results, args.method)
+            total_results += len(results)
+            results = []
+        if len(profiles) >= args.batch_size:
+            bulk_load(db, UserProfile, profiles, args.method)
+            profiles = []
+    bulk_load(db, UserResult, results, args.method)
+    bulk_load(db, UserProfile, profiles, args.method)
+    total_results += len(results)
+    elapsed = time.monotonic() - results_started
+    print(f"Results: {total_results} ({elapsed:.1f}s, {total_results / max(elapsed, 1e-9):.0f} rows/s)")
+
+    cache_bus.publish(db, "stats")
+    db.commit()
+    print(f"Done in {time.monotonic() - started:.1f}s (seed {args.seed}, method {args.method})")
+
+
+# --- replay ----------------------------------------------------------------
+
+def percentile(sorted_values, q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+def mix_from_log(path: str) -> dict:
+    """Scenario weights counted from uvicorn/gunicorn access log request lines."""
+    counts = Counter()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = _LOG_REQUEST.search(line)
+            if not match:
+                continue
+            method, target = match.groups()
+            for name, route_method, pattern in LOG_ROUTES:
+                if method == route_method and pattern.match(target):
+                    counts[name] += 1
+                    break
+    if not counts:
+        sys.exit(f"No known API requests found in {path}")
+    return dict(counts)
+
+
+class Replay:
+    """Runs weighted scenarios against the app and keeps latencies per endpoint."""
+
+    def __init__(self, client, users, result_ids, subjects, rng):
+        self.client = client
+        self.users = users # [(user_id, headers)]
+        self.result_ids = result_ids # user_id -> [result ids]
+        self.subjects = subjects
+        self.rng = rng
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+
+    async def call(self, name: str, method: str, url: str, headers, **kwargs):
+        started = time.perf_counter()
+        response = await self.client.request(method, url, headers=headers, **kwargs)
+        self.latencies[name].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return response.json()
+
+    def pick_answers(self, questions):
+        return {str(q["id"]): self.rng.choice(q["options"]) for q in questions}
+
+    async def run(self, scenario: str) -> None:
+        user_id, headers = self.rng.choice(self.users)
+        subject = self.rng.choice(self.subjects)
+        difficulty = self.rng.choice(["Low", "Medium", "Hard", "Mix"])
+        count = self.rng.choices(TEST_SIZES, TEST_SIZE_WEIGHTS)[0]
+
+        if scenario in ("questions", "submit"):
+            questions = await self.call("questions", "GET", "/api/v1/assessment/questions", headers, params={
+                "subject": subject, "diff": difficulty, "count": count, "fresh": self.rng.random() < 0.3,
+            })
+            if scenario == "submit" and questions:
+                answers = self.pick_answers(questions)
+                await self.call("submit", "POST", "/api/v1/assessment/submit", headers, json={
+                    "subject": subject, "score": self.rng.randint(0, len(answers)),
+                    "total_questions": len(answers), "answers": answers,
+                })
+        elif scenario == "exam":
+            session = await self.call("exam_start", "POST", "/api/v1/assessment/session", headers, json={
+                "subject": subject, "difficulty": difficulty, "count": count, "fresh": True,
+            })
+            if not session:
+                return
+            answers = self.pick_answers(session["questions"])
+            # Autosave in two halves, as the client does while the user works through the test
+            items = list(answers.items())
+            for part in (items[:len(items) // 2], items[len(items) // 2:]):
+                await self.call("exam_autosave", "PATCH", f"/api/v1/assessment/session/{session['session_id']}/answers",
+                                headers, json={"answers": dict(part)})
+            await self.call("exam_finish", "POST", f"/api/v1/assessment/session/{session['session_id']}/finish", headers)
+        elif scenario == "overview":
+            await self.call(scenario, "GET", "/api/v1/assessment/overview", headers)
+        elif scenario == "home_stats":
+            await self.call(scenario, "GET", "/api/v1/home/stats", None)
+        elif scenario == "history":
+            await self.call(scenario, "GET", "/api/v1/profile/history", headers)
+        elif scenario == "progress":
+            await self.call(scenario, "GET", "/api/v1/profile/progress", headers)
+        elif scenario == "profile":
+            await self.call(scenario, "GET", "/api/v1/profile/me", headers)
+        elif scenario == "result":
+            ids = self.result_ids.get(user_id)
+            if ids:
+                await self.call(scenario, "GET", f"/api/v1/assessment/result/{self.rng.choice(ids)}", headers)
+        else:
+            raise ValueError(f"Unknown scenario {scenario!r}")
+
+
+def replay_fixtures(db, sample: int, rng: random.Random):
+    """Load-test users with tokens, a few of their result ids, and the subjects with questions."""
+    from app.core.security import create_access_token
+    from app.models.mcq import MCQ
+    from app.models.result import UserResult
+    from app.models.user import User
+    from app.utils.question_banks import active_bank_id
+
+    users = db.query(User.id, User.email).filter(User.email.like(f"%@{EMAIL_DOMAIN}")).all()
+    if not users:
+        sys.exit("No load-test users; run `python loadgen.py dataset` first")
+    users = rng.sample(users, min(sample, len(users)))
+    result_ids = defaultdict(list)
+    for result_id, user_id in db.query(UserResult.id, UserResult.user_id).filter(
+            UserResult.user_id.in_([uid for uid, _ in users])).order_by(UserResult.user_id, UserResult.id.desc()):
+        if len(result_ids[user_id]) < 5:
+            result_ids[user_id].append(result_id)
+    subjects = [code for (code,) in db.query(MCQ.subject).filter(MCQ.bank_id == active_bank_id(db)).distinct()]
+    tokens = [(uid, {"Authorization": f"Bearer {create_access_token(subject=email)}"}) for uid, email in users]
+    return tokens, dict(result_ids), subjects
+
+async def wait_for_jobs(timeout: float) -> float:
+    """Seconds until the post-submit queue is empty, or timeout."""
+    from app.core.jobs import job_queue
+    from app.db.session import SessionLocal
+
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        db = SessionLocal()
+        try:
+            metrics = job_queue.metrics(db)
+        finally:
+            db.close()
+        if metrics["queue_depth"] == 0 and metrics["running"] == 0:
+            break
+        await asyncio.sleep(0.1)
+    return time.monotonic() - started
+
+async def replay(args, mix: dict) -> None:
+    import httpx
+    from app.core.lifecycle import lifecycle
+    from app.db.session import SessionLocal
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        users, result_ids, subjects = replay_fixtures(db, args.users, rng)
+    finally:
+        db.close()
+    scenarios, weights = list(mix), list(mix.values())
+    plan = rng.choices(scenarios, weights, k=args.requests)
+
+    async with app.router.lifespan_context(app):
+        print(f"Warm-up {lifecycle.status()['warmup_seconds']}s; replaying {args.requests} scenarios "
+              f"with concurrency {args.concurrency}")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen", timeout=None) as client:
+            runner = Replay(client, users, result_ids, subjects, rng)
+            queue = iter(plan)
+
+            async def worker():
+                for scenario in queue:
+                    await runner.run(scenario)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+            drained = await wait_for_jobs(args.drain_timeout)
+
+    total = sum(len(v) for v in runner.latencies.values())
+    print(f"\n{'endpoint':<15}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name in sorted(runner.latencies):
+        values = sorted(runner.latencies[name])
+        print(f"{name:<15}{len(values):>8}{runner.errors[name]:>8}{percentile(values, 50):>10.1f}"
+              f"{percentile(values, 95):>10.1f}{percentile(values, 99):>10.1f}{values[-1]:>10.1f}")
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} req/s in one process); "
+          f"post-submit jobs drained {drained:.1f}s after the last request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset or replay a traffic mix in process.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dataset = commands.add_parser("dataset", help="Bulk-load synthetic users, questions and results")
+    dataset.add_argument("--users", type=int, default=10000)
+    dataset.add_argument("--questions-per-subject", type=int, default=1000,
+                         help="Questions per subject in a new active bank (0 = use the active bank)")
+    dataset.add_argument("--results-per-user", type=float, default=10, help="Median attempts of an active user")
+    dataset.add_argument("--months", type=int, default=6, help="History window for result timestamps")
+    dataset.add_argument("--seed", type=int, default=42)
+    dataset.add_argument("--batch-size", type=int, default=5000, help="Rows per committed batch")
+    dataset.add_argument("--method", choices=["auto", "insert", "copy"], default="auto",
+                         help="copy (PostgreSQL only) or Core executemany inserts; auto picks copy on PostgreSQL")
+
+    traffic = commands.add_parser("replay", help="Drive the ASGI app in process with a weighted request mix")
+    traffic.add_argument("--requests", type=int, default=2000, help="Scenarios to run (a scenario may be several requests)")
+    traffic.add_argument("--concurrency", type=int, default=32, help="Simulated clients in flight at once")
+    traffic.add_argument("--users", type=int, default=500, help="Load-test users to act as")
+    traffic.add_argument("--seed", type=int, default=42)
+    traffic.add_argument("--drain-timeout", type=float, default=120)
+    source = traffic.add_mutually_exclusive_group()
+    source.add_argument("--mix", default=None, help='JSON file of scenario weights, e.g. {"questions": 30, "exam": 10}')
+    source.add_argument("--mix-from-log", default=None, help="Count scenarios in a recorded access log")
+    args = parser.parse_args()
+
+    # Importing the app creates missing tables, like the server does at startup
+    from app.db.session import SessionLocal, engine
+    import app.main  # noqa: F401
+
+    if args.command == "dataset":
+        from app.db.partitioning import ensure_result_partitions
+        if args.method == "auto":
+            args.method = "copy" if engine.dialect.name == "postgresql" else "insert"
+        if args.method == "copy" and engine.dialect.name != "postgresql":
+            sys.exit("COPY needs PostgreSQL; use --method insert")
+        # Monthly partitions for the whole history window rather than the DEFAULT partition
+        ensure_result_partitions(engine, months_back=args.months + 1)
+        db = SessionLocal()
+        try:
+            generate_dataset(db, args)
+        finally:
+            db.close()
+    else:
+        if args.mix_from_log:
+            mix = mix_from_log(args.mix_from_log)
+        elif args.mix:
+            with open(args.mix, encoding="utf-8") as f:
+                mix = json.load(f)
+        else:
+            mix = DEFAULT_MIX
+        unknown = set(mix) - set(DEFAULT_MIX)
+        if unknown:
+            sys.exit(f"Unknown scenarios {sorted(unknown)}; known: {sorted(DEFAULT_MIX)}")
+        print("Mix: " + ", ".join(f"{name}={weight}" for name, weight in mix.items()))
+        asyncio.run(replay(args, mix))
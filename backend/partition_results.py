@@ -0,0 +1,25 @@
+import argparse
+import sys
+import os
+
+# Add the current directory to sys.path so we can import app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.session import engine
+from app.db.migrations import partition_user_results
+# Register the tables user_results refers to, so its foreign keys can be recreated
+import app.models.user  # noqa: F401
+import app.models.subject  # noqa: F401
+import app.models.question_bank  # noqa: F401
+import app.models.result  # noqa: F401
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert a plain user_results table into monthly partitions (PostgreSQL, one-off).")
+    parser.parse_args()
+
+    print("Partitioning user_results (the table is locked until this finishes)...")
+    if partition_user_results(engine):
+        print("Done.")
+    else:
+        print("Nothing to do: not PostgreSQL, or user_results is already partitioned.")
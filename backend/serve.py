@@ -0,0 +1,111 @@
+
+import argparse
+import importlib.util
+import os
+import sys
+
+# Add the current directory to sys.path so we can import app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+
+APP = "app.main:app"
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY if set, else 2 x cores + 1 (handlers are sync and spend most time waiting on the DB)."""
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    return cores * 2 + 1
+
+def uvicorn_worker_class() -> str:
+    # The worker moved out of uvicorn into the uvicorn-worker package
+    if importlib.util.find_spec("uvicorn_worker"):
+        return "uvicorn_worker.UvicornWorker"
+    return "uvicorn.workers.UvicornWorker"
+
+def post_fork(server, worker):
+    # Pooled connections opened while preloading belong to the master; never share them
+    from app.db.session import engine, read_router
+    engine.dispose(close=False)
+    for replica in (read_router.replicas.engines if read_router.replicas else []):
+        replica.dispose(close=False)
+
+def serve_gunicorn(args) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{args.host}:{args.port}",
+                "workers": args.workers,
+                "worker_class": uvicorn_worker_class(),
+                # Import (and create tables) once in the master; workers fork from it
+                "preload_app": True,
+                "post_fork": post_fork,
+                # Not-ready grace period, then the lifespan's job drain; leave room for both
+                "graceful_timeout": settings.SHUTDOWN_DELAY_SECONDS + settings.SHUTDOWN_DRAIN_SECONDS + 10,
+                "timeout": args.timeout,
+                "keepalive": 5,
+                # Recycle workers now and then, staggered so they never restart together
+                "max_requests": args.max_requests,
+                "max_requests_jitter": max(args.max_requests // 10, 1) if args.max_requests else 0,
+                "accesslog": "-" if args.access_log else None,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    Application().run()
+
+def serve_uvicorn(args) -> None:
+    import uvicorn
+    # uvicorn's own supervisor: no preloading, each worker imports the app itself
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=settings.SHUTDOWN_DRAIN_SECONDS + 10,
+        limit_max_requests=args.max_requests or None,
+        access_log=args.access_log,
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=None, help="Default: WEB_CONCURRENCY or 2 x cores + 1")
+    parser.add_argument("--timeout", type=int, default=60, help="Seconds before a silent worker is restarted")
+    parser.add_argument("--max-requests", type=int, default=10000, help="Recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--shutdown-delay", type=int, default=settings.SHUTDOWN_DELAY_SECONDS or 10,
+                        help="Seconds to keep serving as not-ready after SIGTERM (default: SHUTDOWN_DELAY_SECONDS or 10)")
+    parser.add_argument("--access-log", action="store_true")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "uvicorn"], default="auto",
+                        help="gunicorn (preforked, preloaded) when installed, else uvicorn's supervisor")
+    args = parser.parse_args()
+    explicit_workers = args.workers or settings.WEB_CONCURRENCY
+    args.workers = args.workers or default_workers()
+    if args.workers > 1 and not settings.REDIS_URL:
+        # Exam sessions would live in one worker's memory and 404 on every other worker
+        if explicit_workers:
+            sys.exit("Several workers need REDIS_URL for shared exam sessions; set it or use --workers 1")
+        print("REDIS_URL is not set: running 1 worker so exam sessions stay in one process")
+        args.workers = 1
+
+    # Preloaded (gunicorn) workers inherit the settings object; spawned (uvicorn) ones read the environment
+    settings.SHUTDOWN_DELAY_SECONDS = args.shutdown_delay
+    os.environ["SHUTDOWN_DELAY_SECONDS"] = str(args.shutdown_delay)
+
+    use_gunicorn = args.server == "gunicorn" or (
+        args.server == "auto" and os.name != "nt" and importlib.util.find_spec("gunicorn") is not None
+    )
+    print(f"Serving {APP} on {args.host}:{args.port} with {args.workers} "
+          f"{'gunicorn' if use_gunicorn else 'uvicorn'} workers")
+    if use_gunicorn:
+        serve_gunicorn(args)
+    else:
+        serve_uvicorn(args)
@@ -0,0 +1,113 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# Settings are read at import time; point them at a throwaway database.
+_TMP_DIR = tempfile.mkdtemp(prefix="govtech_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'app.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import exam_session
+from app.core.kvstore import MemoryStore
+from app.schemas.exam_session import AnswerPatch
+
+USER = SimpleNamespace(id=7)
+SESSION_ID = "abc"
+QUESTION_IDS = [11, 12, 13]
+
+
+class BlockingStore(MemoryStore):
+    """Holds every finish at the answers read until both have loaded the session."""
+
+    def __init__(self, parties: int):
+        super().__init__()
+        self.barrier = threading.Barrier(parties, timeout=5)
+
+    def hgetall(self, key):
+        values = super().hgetall(key)
+        if key.endswith(":answers"):
+            self.barrier.wait()
+        return values
+
+
+class TestExamSessionEndpoints(unittest.TestCase):
+    """Endpoint functions against a private store; grading and the DB write are stubbed."""
+
+    def start_session(self, store, ttl: int = 600) -> None:
+        store.hset(exam_session._meta_key(SESSION_ID), {
+            "user_id": USER.id, "subject": "ds", "question_ids": ",".join(map(str, QUESTION_IDS)),
+        }, ttl=ttl)
+
+    def patch_endpoint(self, store, record_result):
+        patches = [
+            mock.patch.object(exam_session, "store", store),
+            mock.patch.object(exam_session, "answer_keys", lambda db, ids: {qid: "a" for qid in ids}),
+            mock.patch.object(exam_session, "record_result", record_result),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def recorded(db, user_id, subject, score, total_questions, answers):
+        return SimpleNamespace(id=1, score=score, total_questions=total_questions,
+                               accuracy=score / total_questions * 100)
+
+    def test_concurrent_finish_records_once(self):
+        store = BlockingStore(parties=2)
+        record_result = mock.Mock(side_effect=self.recorded)
+        self.patch_endpoint(store, record_result)
+        self.start_session(store)
+        outcomes = []
+
+        def finish():
+            try:
+                outcomes.append(exam_session.finish_exam_session(SESSION_ID, USER, db=None).score)
+            except HTTPException as e:
+                outcomes.append(e.status_code)
+
+        threads = [threading.Thread(target=finish) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(outcomes), [0, 409])
+        self.assertEqual(record_result.call_count, 1)
+
+    def test_failed_finish_restores_the_remaining_ttl(self):
+        store = MemoryStore()
+        self.patch_endpoint(store, mock.Mock(side_effect=RuntimeError("database unavailable")))
+        self.start_session(store, ttl=120)
+
+        with self.assertRaises(RuntimeError):
+            exam_session.finish_exam_session(SESSION_ID, USER, db=None)
+        self.assertTrue(0 < store.ttl(exam_session._meta_key(SESSION_ID)) <= 120)
+
+        # The retry finds the session again
+        with mock.patch.object(exam_session, "record_result", self.recorded):
+            self.assertEqual(exam_session.finish_exam_session(SESSION_ID, USER, db=None).total_questions, 3)
+
+    def test_autosave_rejects_questions_outside_the_session(self):
+        store = MemoryStore()
+        self.patch_endpoint(store, self.recorded)
+        self.start_session(store)
+
+        with self.assertRaises(HTTPException) as raised:
+            exam_session.autosave_answers(SESSION_ID, AnswerPatch(answers={11: "a", 99: "b"}), USER)
+        self.assertEqual(raised.exception.status_code, 400)
+        self.assertEqual(store.hgetall(exam_session._answers_key(SESSION_ID)), {})
+
+        saved = exam_session.autosave_answers(SESSION_ID, AnswerPatch(answers={11: "a"}), USER)
+        self.assertEqual(saved["saved"], 1)
+        self.assertEqual(store.hgetall(exam_session._answers_key(SESSION_ID)), {"11": "a"})
+
+
+if __name__ == "__main__":
+    unittest.main()
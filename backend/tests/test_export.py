@@ -0,0 +1,88 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+# Settings are read at import time; point them at a throwaway database.
+_TMP_DIR = tempfile.mkdtemp(prefix="govtech_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'app.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.mcq import MCQ
+from app.models.result import UserResult
+from app.utils.export import EXPORT_COLUMNS, export_chunks, export_watermark, parquet_available
+import app.models.user  # noqa: F401 - register tables referenced by foreign keys
+import app.models.subject  # noqa: F401
+import app.models.question_bank  # noqa: F401
+
+ROWS = 12
+
+
+@unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+class TestParquetExport(unittest.TestCase):
+
+    def setUp(self):
+        # A private in-memory database, so the export sees exactly these rows
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.db.add_all([
+            MCQ(bank_id=1, subject="ds", difficulty_level=n % 3 + 1, question=f"Question {n}",
+                option_a="a", option_b="b", option_c="c", option_d="d", correct_answer="a",
+                explanation=None if n % 2 else "why")
+            for n in range(ROWS)
+        ])
+        self.db.add_all([
+            UserResult(user_id=n % 3 + 1, subject="ds", bank_id=1, score=n, total_questions=ROWS,
+                       accuracy=n / ROWS * 100, answers={str(n + 1): "a"},
+                       created_at=datetime(2026, 1, n + 1, tzinfo=timezone.utc))
+            for n in range(ROWS)
+        ])
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+
+    def read_back(self, dataset: str):
+        import pyarrow.parquet as pq
+
+        watermark = export_watermark(self.db, dataset)
+        data = b"".join(export_chunks(self.db, dataset, "parquet", watermark))
+        return pq.read_table(io.BytesIO(data))
+
+    def test_questions_round_trip(self):
+        table = self.read_back("questions")
+        self.assertEqual(table.column_names, [column.key for column in EXPORT_COLUMNS["questions"]])
+        self.assertEqual(table.num_rows, ROWS)
+        self.assertEqual(table.column("bank_id").to_pylist(), [1] * ROWS)
+        self.assertEqual(table.column("question").to_pylist()[3], "Question 3")
+        self.assertEqual(table.column("explanation").to_pylist()[:2], ["why", None])
+
+    def test_results_round_trip(self):
+        table = self.read_back("results")
+        self.assertEqual(table.column_names, [column.key for column in EXPORT_COLUMNS["results"]])
+        self.assertEqual(table.num_rows, ROWS)
+        self.assertEqual(table.column("bank_id").to_pylist(), [1] * ROWS)
+        self.assertEqual(table.column("score").to_pylist(), list(range(ROWS)))
+        self.assertEqual(table.column("answers").to_pylist()[0], '{"1":"a"}')
+        self.assertEqual(str(table.schema.field("created_at").type), "timestamp[us, tz=UTC]")
+        self.assertEqual(table.column("created_at").to_pylist()[1], datetime(2026, 1, 2, tzinfo=timezone.utc))
+
+    def test_results_watermark_leaves_recent_rows_for_the_next_run(self):
+        before = export_watermark(self.db, "results")
+        # Committed just now: a lower id could still be in flight, so this row waits for the next run
+        self.db.add(UserResult(user_id=1, subject="ds", score=1, total_questions=1, accuracy=100,
+                               created_at=datetime.now(timezone.utc)))
+        self.db.commit()
+        self.assertEqual(export_watermark(self.db, "results"), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import os
+import queue
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Settings are read at import time; point them at a throwaway database.
+_TMP_DIR = tempfile.mkdtemp(prefix="govtech_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'app.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.jobs import LEASE_SECONDS, JobQueue
+from app.models.base import Base
+from app.models.cache_version import CacheVersion
+from app.models.job import BackgroundJob
+from app.models.profile import UserProfile
+from app.models.result import UserResult
+from app.models.user import User
+from app.utils.results import process_result
+import app.models.subject  # noqa: F401 - register tables referenced by foreign keys
+import app.models.question_bank  # noqa: F401
+
+
+class RacingQueue(queue.Queue):
+    """Reports room when checked, then is full by the time the job is handed over."""
+
+    def put_nowait(self, item):
+        raise queue.Full
+
+
+class TestJobQueue(unittest.TestCase):
+    """Drives the poller and workers by hand (no threads) against a private SQLite file."""
+
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(dir=_TMP_DIR), "jobs.db")
+        self.engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.jobs = JobQueue(self.Session, workers=1, maxsize=10, max_attempts=2, poll_interval=60)
+        self.calls = []
+
+        @self.jobs.handler("bump")
+        def bump(db, payload):
+            self.calls.append(payload)
+            db.add(CacheVersion(key=payload["key"], version=1, updated_at=datetime.now(timezone.utc)))
+
+        @self.jobs.handler("fail")
+        def fail(db, payload):
+            self.calls.append(payload)
+            raise RuntimeError("boom")
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def stored(self, name: str, payload: dict, status: str = "pending", run_after=None) -> int:
+        db = self.Session()
+        try:
+            job = BackgroundJob(name=name, payload=payload, status=status,
+                                run_after=run_after or datetime.now(timezone.utc) - timedelta(seconds=1))
+            db.add(job)
+            db.commit()
+            return job.id
+        finally:
+            db.close()
+
+    def job(self, job_id: int):
+        db = self.Session()
+        try:
+            return db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+        finally:
+            db.close()
+
+    def run_claimed(self) -> int:
+        """Claim due rows and run whatever the poller queued; returns how many ran."""
+        self.jobs._claim_due()
+        ran = 0
+        for jobs in self.jobs._queues:
+            while not jobs.empty():
+                self.jobs._run(*jobs.get_nowait())
+                ran += 1
+        return ran
+
+    def test_stored_job_is_deleted_with_the_handlers_writes(self):
+        job_id = self.stored("bump", {"key": "a"})
+        self.assertEqual(self.run_claimed(), 1)
+        self.assertIsNone(self.job(job_id))
+        db = self.Session()
+        self.assertEqual(db.query(CacheVersion.key).scalar(), "a")
+        db.close()
+
+    def test_failing_job_is_retried_then_dead_lettered(self):
+        job_id = self.stored("fail", {"n": 1})
+        self.run_claimed()
+        job = self.job(job_id)
+        self.assertEqual((job.status, job.attempts), ("pending", 1))
+        self.assertGreater(job.run_after.replace(tzinfo=timezone.utc), datetime.now(timezone.utc))
+
+        # Nothing runs before the backoff is over
+        self.assertEqual(self.run_claimed(), 0)
+        db = self.Session()
+        db.query(BackgroundJob).update({BackgroundJob.run_after: datetime.now(timezone.utc) - timedelta(seconds=1)})
+        db.commit()
+        db.close()
+
+        self.run_claimed()
+        job = self.job(job_id)
+        self.assertEqual((job.status, job.attempts), ("dead", 2))
+        self.assertIn("boom", job.last_error)
+        self.assertEqual(self.run_claimed(), 0)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_expired_lease_is_claimed_again(self):
+        leased = self.stored("bump", {"key": "lost"}, status="running")
+        self.stored("bump", {"key": "held"}, status="running",
+                    run_after=datetime.now(timezone.utc) + timedelta(seconds=LEASE_SECONDS))
+        # Only the row whose lease ran out (its process died mid-job) is picked up
+        self.assertEqual(self.run_claimed(), 1)
+        self.assertEqual(self.calls, [{"key": "lost"}])
+        self.assertIsNone(self.job(leased))
+
+    def test_full_queue_hands_the_job_back(self):
+        self.jobs._queues[0] = RacingQueue(maxsize=10)
+        job_id = self.stored("bump", {"key": "a"})
+        self.jobs._claim_due()
+        job = self.job(job_id)
+        # The lease is released at once instead of waiting LEASE_SECONDS
+        self.assertEqual(job.status, "pending")
+        self.assertLessEqual(job.run_after.replace(tzinfo=timezone.utc), datetime.now(timezone.utc))
+
+    def test_full_queues_leave_due_jobs_in_the_table(self):
+        self.jobs._queues[0] = queue.Queue(maxsize=1)
+        self.jobs._queues[0].put_nowait(("bump", {"key": "queued"}, None, 0, None))
+        job_id = self.stored("bump", {"key": "a"})
+        self.jobs._claim_due()
+        self.assertEqual(self.job(job_id).status, "pending")
+
+
+class TestProcessResultReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        user = User(email="a@example.com", full_name="A", provider="local", is_active=True)
+        self.db.add(user)
+        self.db.flush()
+        self.db.add(UserProfile(user_id=user.id, tests_taken=0, avg_accuracy=0, subjects_interested="[]"))
+        result = UserResult(user_id=user.id, subject="ds", score=1, total_questions=2, accuracy=50,
+                            answers={}, created_at=datetime.now(timezone.utc))
+        self.db.add(result)
+        self.db.commit()
+        self.user_id, self.result_id = user.id, result.id
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_redelivered_job_changes_nothing(self):
+        for _ in range(2):
+            process_result(self.db, {"result_id": self.result_id})
+            self.db.commit()
+        profile = self.db.query(UserProfile).filter(UserProfile.user_id == self.user_id).one()
+        self.assertEqual(profile.tests_taken, 1)
+        self.assertIsNotNone(self.db.get(UserResult, self.result_id).processed_at)
+
+
+if __name__ == "__main__":
+    unittest.main()
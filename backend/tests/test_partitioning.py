@@ -0,0 +1,105 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import uuid
+from datetime import datetime, timezone
+
+# Settings are read at import time; point them at a throwaway database.
+_TMP_DIR = tempfile.mkdtemp(prefix="govtech_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'app.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from app.db.migrations import partition_user_results
+from app.db.partitioning import DEFAULT_PARTITION, add_months, ensure_result_partitions, month_start
+from app.models.base import Base
+import app.models.user  # noqa: F401 - register tables referenced by foreign keys
+import app.models.subject  # noqa: F401
+import app.models.question_bank  # noqa: F401
+import app.models.result  # noqa: F401
+
+# e.g. postgresql+psycopg2://postgres@localhost/govtech_test; each test works in its own schema
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@unittest.skipUnless(POSTGRES_URL, "TEST_POSTGRES_URL is not set")
+class TestResultPartitions(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = f"test_{uuid.uuid4().hex[:12]}"
+        self.admin = create_engine(POSTGRES_URL)
+        with self.admin.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA {self.schema}"))
+        self.engine = create_engine(POSTGRES_URL, connect_args={"options": f"-csearch_path={self.schema}"})
+        # The models are loaded for SQLite here, so this is the pre-partitioning plain table
+        Base.metadata.create_all(bind=self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text("INSERT INTO users (id, email, full_name, provider, is_active) "
+                              "VALUES (1, 'a@example.com', 'A', 'local', true)"))
+
+    def tearDown(self):
+        self.engine.dispose()
+        with self.admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {self.schema} CASCADE"))
+        self.admin.dispose()
+
+    def insert_result(self, conn, created_at) -> int:
+        return conn.execute(text(
+            "INSERT INTO user_results (user_id, subject, score, total_questions, accuracy, created_at) "
+            "VALUES (1, 'ds', 1, 1, 100, :created_at) RETURNING id"), {"created_at": created_at}).scalar()
+
+    def partition_of(self, result_id: int) -> str:
+        with self.engine.connect() as conn:
+            return conn.execute(text("SELECT tableoid::regclass::text FROM user_results WHERE id = :id"),
+                                {"id": result_id}).scalar()
+
+    def test_plain_table_is_skipped_until_converted(self):
+        old = datetime(2020, 5, 17, tzinfo=timezone.utc)
+        with self.engine.begin() as conn:
+            first = self.insert_result(conn, old)
+        self.assertFalse(ensure_result_partitions(self.engine))
+
+        self.assertTrue(partition_user_results(self.engine))
+        self.assertFalse(partition_user_results(self.engine))
+        self.assertTrue(ensure_result_partitions(self.engine))
+        self.assertEqual(self.partition_of(first), "user_results_p2020_05")
+        # The id sequence carries on past the copied rows
+        with self.engine.begin() as conn:
+            self.assertGreater(self.insert_result(conn, datetime.now(timezone.utc)), first)
+
+    def test_rows_stranded_in_default_move_to_their_month(self):
+        partition_user_results(self.engine, months_ahead=0)
+        later = add_months(month_start(datetime.now(timezone.utc)), 5)
+        with self.engine.begin() as conn:
+            result_id = self.insert_result(conn, datetime(later.year, later.month, 2, tzinfo=timezone.utc))
+        self.assertEqual(self.partition_of(result_id), DEFAULT_PARTITION)
+
+        ensure_result_partitions(self.engine, months_ahead=5)
+        self.assertEqual(self.partition_of(result_id), f"user_results_p{later:%Y_%m}")
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar(), 0)
+
+    def test_workers_maintain_partitions_concurrently(self):
+        partition_user_results(self.engine, months_ahead=0)
+        errors = []
+
+        def maintain():
+            try:
+                ensure_result_partitions(self.engine, months_ahead=6)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=maintain) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
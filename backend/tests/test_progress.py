@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Settings are read at import time; point them at a throwaway database.
+_TMP_DIR = tempfile.mkdtemp(prefix="govtech_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'app.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.progress import UserProgressSummary
+from app.utils.progress import update_progress
+import app.models.user  # noqa: F401 - register tables referenced by foreign keys
+import app.models.subject  # noqa: F401
+
+START = datetime(2026, 3, 10, 9, tzinfo=timezone.utc)
+
+
+class TestProgressStreak(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+
+    def tearDown(self):
+        self.db.close()
+
+    def attempt(self, days: int) -> UserProgressSummary:
+        update_progress(self.db, user_id=1, subject="ds", score=1, total_questions=1, accuracy=100,
+                        graded={}, topics={}, when=START + timedelta(days=days))
+        self.db.commit()
+        return self.db.query(UserProgressSummary).filter(UserProgressSummary.user_id == 1).one()
+
+    def test_consecutive_days_extend_the_streak(self):
+        self.attempt(0)
+        self.attempt(0)
+        summary = self.attempt(1)
+        self.assertEqual((summary.current_streak, summary.longest_streak), (2, 2))
+        summary = self.attempt(3)
+        self.assertEqual((summary.current_streak, summary.longest_streak), (1, 2))
+
+    def test_late_attempt_leaves_the_streak_alone(self):
+        self.attempt(0)
+        self.attempt(1)
+        # A retried job for an older attempt arrives after newer ones were counted
+        for days in (-5, 0, 1):
+            summary = self.attempt(days)
+            self.assertEqual(summary.current_streak, 2)
+            self.assertEqual(summary.last_active_day, (START + timedelta(days=1)).date())
+        self.assertEqual(summary.attempts, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
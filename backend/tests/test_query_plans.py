@@ -0,0 +1,251 @@
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Settings are read at import time; point them at a throwaway database.
+_TMP_DIR = tempfile.mkdtemp(prefix="govtech_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'app.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, insert, text
+
+from app.main import app
+from app.core.jobs import job_queue
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.models.mcq import MCQ
+from app.models.profile import UserProfile
+from app.models.result import UserResult
+from app.models.user import User
+from app.utils.question_banks import activate_bank, create_bank
+from app.utils.subjects import SUBJECT_MAP, ensure_chapter, ensure_subjects
+
+# Synthetic dataset; every table at or above LARGE_TABLE_ROWS must be reached through an index
+QUESTIONS_PER_SUBJECT = 1500
+USERS = 2000
+RESULTS_PER_USER = 5
+LARGE_TABLE_ROWS = 1000
+
+# Maximum statements one request may issue (cold caches, background jobs excluded)
+MAX_QUERIES = {
+    "get_questions": 3,
+    "get_questions_fresh": 5,
+    "get_assessment_overview": 2,
+    "get_user_history": 3,
+    "get_assessment_result": 4,
+    "submit_assessment": 4,
+}
+
+# Whole-table reads that are accepted, per request, with the reason
+FULL_SCANS_ALLOWED = {
+    # Aggregates the whole bank once per process; cached under bus key "questions"
+    "get_assessment_overview": {"mcq"},
+}
+
+# SQLite: "SCAN mcq" and "SCAN mcq USING [COVERING] INDEX ..." both read every row;
+# only "SEARCH ..." narrows through an index
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)")
+# PostgreSQL partitions (user_results_p2026_01, user_results_default) count as their parent
+_PARTITION_SUFFIX = re.compile(r"_(p\d{4}_\d{2}|default)$")
+
+
+def seed_dataset(db) -> None:
+    """Deterministic bank, users and results, bulk inserted through Core."""
+    rng = random.Random(1234)
+    subject_ids = ensure_subjects(db)
+    bank = create_bank(db, source="synthetic")
+    mcq_rows = []
+    for code in SUBJECT_MAP.values():
+        chapters = [ensure_chapter(db, subject_ids, code, f"Chapter {n}") for n in range(10)]
+        for n in range(QUESTIONS_PER_SUBJECT):
+            mcq_rows.append({
+                "bank_id": bank.id, "subject": code, "subject_id": subject_ids[code], "topic_id": rng.choice(chapters),
+                "difficulty_level": rng.randint(1, 3), "question": f"{code} question {n}",
+                "option_a": "a", "option_b": "b", "option_c": "c", "option_d": "d",
+                "correct_answer": "a", "explanation": "",
+            })
+    db.execute(insert(MCQ), mcq_rows)
+    activate_bank(db, bank)
+
+    db.execute(insert(User), [
+        {"email": f"user{n}@example.com", "full_name": f"User {n}", "provider": "local", "is_active": True}
+        for n in range(USERS)
+    ])
+    user_ids = [uid for (uid,) in db.query(User.id).order_by(User.id)]
+    db.execute(insert(UserProfile), [
+        {"user_id": uid, "tests_taken": RESULTS_PER_USER, "avg_accuracy": 50, "subjects_interested": "[]"}
+        for uid in user_ids
+    ])
+
+    max_id = db.query(func.max(MCQ.id)).scalar()
+    now = datetime.now(timezone.utc)
+    db.execute(insert(UserResult), [
+        {
+            "user_id": uid, "subject": "ds", "subject_id": subject_ids["ds"], "bank_id": bank.id, "score": 5,
+            "total_questions": 10, "accuracy": 50.0,
+            "answers": {str(rng.randint(1, max_id)): "a" for _ in range(10)},
+            "created_at": now - timedelta(days=rng.randint(0, 90)),
+        }
+        for uid in user_ids for _ in range(RESULTS_PER_USER)
+    ])
+    db.commit()
+
+
+class StatementLog:
+    """Statements sent to the engine while active, tagged with whether a job worker sent them."""
+
+    def __init__(self):
+        self.statements = []
+        self.active = False
+        self.jobs_only = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and not executemany:
+            from_job = threading.current_thread().name.startswith("job-")
+            if from_job or not self.jobs_only:
+                self.statements.append((statement, parameters, from_job))
+
+    def request_statements(self):
+        return [(s, p) for s, p, from_job in self.statements if not from_job]
+
+
+def full_scans(conn, statement, parameters) -> set:
+    """Tables the planner would read in full to run statement."""
+    if not re.match(r"\s*(SELECT|UPDATE|DELETE|WITH|INSERT)", statement, re.IGNORECASE):
+        return set()
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+        scans, nodes = set(), [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            # An index scan without an Index Cond walks the whole index
+            if node["Node Type"] == "Seq Scan" or (
+                    node["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in node):
+                scans.add(_PARTITION_SUFFIX.sub("", node["Relation Name"]))
+            nodes.extend(node.get("Plans", []))
+        return scans
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return {m.group(1) for m in (_SQLITE_FULL_SCAN.match(row[-1]) for row in rows) if m}
+
+
+class TestHotQueryPlans(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        db = SessionLocal()
+        try:
+            if db.query(User.id).first() is not None:
+                raise unittest.SkipTest("query plan tests seed their own data and need an empty database")
+            seed_dataset(db)
+            # Planner statistics for the fresh data (same statement on SQLite and PostgreSQL)
+            db.execute(text("ANALYZE"))
+            db.commit()
+            cls.large_tables = {
+                table.name for table in MCQ.metadata.sorted_tables
+                if db.execute(text(f"SELECT COUNT(*) FROM {table.name}")).scalar() >= LARGE_TABLE_ROWS
+            }
+            cls.user = db.query(User).filter(User.email == "user7@example.com").one()
+            cls.result_id = db.query(UserResult.id).filter(UserResult.user_id == cls.user.id).first()[0]
+        finally:
+            db.close()
+
+        cls.client = TestClient(app)
+        cls.headers = {"Authorization": f"Bearer {create_access_token(subject=cls.user.email)}"}
+        cls.log = StatementLog()
+        event.listen(engine, "before_cursor_execute", cls.log)
+
+    @classmethod
+    def tearDownClass(cls):
+        event.remove(engine, "before_cursor_execute", cls.log)
+
+    def capture(self, method: str, url: str, **kwargs):
+        self.log.statements = []
+        self.log.active = True
+        try:
+            response = self.client.request(method, url, headers=self.headers, **kwargs)
+            self.assertLess(response.status_code, 400, response.text)
+            if method != "GET":
+                # Keep recording the jobs the request enqueued, but not our own polling
+                self.log.jobs_only = True
+                self.wait_for_jobs()
+        finally:
+            self.log.active = False
+            self.log.jobs_only = False
+        return response
+
+    def wait_for_jobs(self, timeout: float = 5) -> None:
+        deadline = time.monotonic() + timeout
+        db = SessionLocal()
+        try:
+            while time.monotonic() < deadline:
+                metrics = job_queue.metrics(db)
+                if metrics["queue_depth"] == 0 and metrics["running"] == 0 and \
+                        metrics["processed"] + metrics["failed"] >= metrics["enqueued"]:
+                    return
+                time.sleep(0.02)
+        finally:
+            db.close()
+        self.fail("background jobs did not finish")
+
+    def assert_plans(self, name: str) -> None:
+        request_statements = self.log.request_statements()
+        self.assertLessEqual(
+            len(request_statements), MAX_QUERIES[name],
+            f"{name} issued {len(request_statements)} queries:\n" + "\n".join(s for s, _ in request_statements)
+        )
+        with engine.connect() as conn:
+            for statement, parameters, _ in self.log.statements:
+                scanned = full_scans(conn, statement, parameters) & self.large_tables
+                scanned -= FULL_SCANS_ALLOWED.get(name, set())
+                self.assertFalse(scanned, f"{name} full-scans {sorted(scanned)}:\n{statement}")
+
+    def test_get_questions(self):
+        # diff is the endpoint's query alias; the levels prove the filter was applied
+        for params, levels in (({"subject": "ds", "diff": "Hard", "count": 10}, {3}),
+                               ({"subject": "os", "diff": "Mix", "count": 20}, {1, 2, 3}),
+                               ({"subject": "ds", "topic": "Chapter 3", "count": 5}, {2})):
+            response = self.capture("GET", "/api/v1/assessment/questions", params=params)
+            questions = response.json()
+            self.assertEqual(len(questions), params["count"])
+            self.assertTrue({q["difficulty_level"] for q in questions} <= levels, params)
+            self.assertTrue(all(q["subject"] == params["subject"] for q in questions), params)
+            self.assert_plans("get_questions")
+
+    def test_get_questions_fresh(self):
+        params = {"subject": "ds", "diff": "Medium", "count": 10, "fresh": True}
+        response = self.capture("GET", "/api/v1/assessment/questions", params=params)
+        self.assertEqual(len(response.json()), params["count"])
+        self.assert_plans("get_questions_fresh")
+
+    def test_get_assessment_overview(self):
+        self.capture("GET", "/api/v1/assessment/overview")
+        self.assert_plans("get_assessment_overview")
+
+    def test_get_user_history(self):
+        for params in ({}, {"months": 2}):
+            self.capture("GET", "/api/v1/profile/history", params=params)
+            self.assert_plans("get_user_history")
+
+    def test_get_assessment_result(self):
+        self.capture("GET", f"/api/v1/assessment/result/{self.result_id}")
+        self.assert_plans("get_assessment_result")
+
+    def test_submit_assessment(self):
+        answers = {str(qid): "b" for qid in range(1, 11)}
+        self.capture("POST", "/api/v1/assessment/submit",
+                     json={"subject": "ds", "score": 0, "total_questions": 10, "answers": answers})
+        # Plans of the post-submit job are checked too, only its query count is not capped
+        self.assertTrue(any(from_job for _, _, from_job in self.log.statements))
+        self.assert_plans("submit_assessment")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Settings are read at import time; point them at a throwaway database.
+_TMP_DIR = tempfile.mkdtemp(prefix="govtech_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'app.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from app.core.kvstore import MemoryStore
+from app.db.session import ReadRouter, RoutingSession
+from app.models.base import Base
+from app.models.mcq import MCQ
+import app.models.user  # noqa: F401 - register tables referenced by foreign keys
+import app.models.profile  # noqa: F401
+import app.models.result  # noqa: F401
+import app.models.subject  # noqa: F401
+import app.models.question_bank  # noqa: F401
+
+
+def make_mcq(question: str) -> MCQ:
+    return MCQ(
+        subject="ds", difficulty_level=1, question=question,
+        option_a="a", option_b="b", option_c="c", option_d="d",
+        correct_answer="a",
+    )
+
+
+class TestReadReplicaRouting(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp(dir=_TMP_DIR)
+        self.primary_url = f"sqlite:///{os.path.join(tmp, 'primary.db')}"
+        self.replica_url = f"sqlite:///{os.path.join(tmp, 'replica.db')}"
+        self.primary = create_engine(self.primary_url)
+        self.replica = create_engine(self.replica_url)
+        for eng in (self.primary, self.replica):
+            Base.metadata.create_all(bind=eng)
+
+        # Distinct content in each database tells us which one served a query
+        for eng, question in ((self.primary, "from primary"), (self.replica, "from replica")):
+            db = RoutingSession(primary=eng)
+            db.add(make_mcq(question))
+            db.commit()
+            db.close()
+
+    def tearDown(self):
+        self.primary.dispose()
+        self.replica.dispose()
+
+    def router(self, replica_urls=None, **kwargs) -> ReadRouter:
+        # A private store per test, so pins do not leak between tests
+        kwargs.setdefault("store", MemoryStore())
+        return ReadRouter(self.primary, [self.replica_url] if replica_urls is None else replica_urls, **kwargs)
+
+    def questions(self, db) -> list:
+        return [q for (q,) in db.query(MCQ.question).order_by(MCQ.id).all()]
+
+    def test_reads_go_to_replica(self):
+        router = self.router()
+        db = router.session()
+        self.assertEqual(self.questions(db), ["from replica"])
+        db.close()
+
+    def test_writes_go_to_primary(self):
+        router = self.router()
+        db = router.session()
+        db.add(make_mcq("written"))
+        db.commit()
+        db.close()
+
+        primary_db = RoutingSession(primary=self.primary)
+        self.assertEqual(self.questions(primary_db), ["from primary", "written"])
+        primary_db.close()
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        missing = f"sqlite:///{os.path.join(_TMP_DIR, 'missing', 'dir', 'replica.db')}"
+        router = self.router([missing, self.replica_url])
+        # Both picks skip the broken replica, whichever one round-robin starts from
+        for _ in range(2):
+            db = router.session()
+            self.assertEqual(self.questions(db), ["from replica"])
+            db.close()
+
+        only_missing = self.router([missing])
+        db = only_missing.session()
+        self.assertEqual(self.questions(db), ["from primary"])
+        db.close()
+
+    def test_read_your_writes_stickiness(self):
+        router = self.router(sticky_seconds=60)
+        router.record_write(user_id=7)
+
+        pinned = router.session(user_id=7)
+        self.assertEqual(self.questions(pinned), ["from primary"])
+        pinned.close()
+
+        other = router.session(user_id=8)
+        self.assertEqual(self.questions(other), ["from replica"])
+        other.close()
+
+    def test_stickiness_is_shared_between_workers(self):
+        # Two routers over one store stand in for two worker processes sharing Redis
+        shared = MemoryStore()
+        writer = self.router(sticky_seconds=60, store=shared)
+        reader = self.router(sticky_seconds=60, store=shared)
+        writer.record_write(user_id=7)
+
+        db = reader.session(user_id=7)
+        self.assertEqual(self.questions(db), ["from primary"])
+        db.close()
+
+    def test_textual_sql_and_locking_reads_go_to_primary(self):
+        router = self.router()
+        db = router.session()
+        # Textual SQL may write (pg_notify, DDL), so it never runs on a replica
+        self.assertEqual(db.execute(text("SELECT question FROM mcq")).scalars().all(), ["from primary"])
+        self.assertEqual(db.query(MCQ.question).with_for_update().scalar(), "from primary")
+        self.assertEqual(self.questions(db), ["from replica"])
+        db.close()
+
+    def test_stickiness_expires(self):
+        router = self.router(sticky_seconds=0)
+        router.record_write(user_id=7)
+        self.assertFalse(router.is_pinned(7))
+
+    def test_no_replicas_uses_primary(self):
+        router = self.router([])
+        db = router.session(user_id=1)
+        self.assertEqual(self.questions(db), ["from primary"])
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Settings are read at import time; point them at a throwaway database.
+_TMP_DIR = tempfile.mkdtemp(prefix="govtech_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'app.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import JWTError, jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.tokens import TokenService
+from app.models.base import Base
+from app.models.revoked_token import RevokedToken
+
+ALGORITHM = "HS256"
+
+
+def make_service(keys, active_kid, legacy_key=None) -> TokenService:
+    return TokenService(keys=keys, active_kid=active_kid, algorithm=ALGORITHM, legacy_key=legacy_key)
+
+
+class TestTokenVerification(unittest.TestCase):
+
+    def test_cached_claims_expire_with_the_token(self):
+        service = make_service({"a": "secret-a"}, "a")
+        token = service.create_access_token("user@example.com", expires_delta=timedelta(seconds=1))
+        self.assertEqual(service.decode(token)["sub"], "user@example.com")
+        time.sleep(2)
+        with self.assertRaises(JWTError):
+            service.decode(token)
+
+    def test_rotated_keys_keep_verifying_until_removed(self):
+        old = make_service({"a": "secret-a"}, "a")
+        token = old.create_access_token("user@example.com")
+
+        rotated = make_service({"a": "secret-a", "b": "secret-b"}, "b")
+        self.assertEqual(rotated.decode(token)["sub"], "user@example.com")
+        self.assertEqual(jwt.get_unverified_header(rotated.create_access_token("x"))["kid"], "b")
+
+        retired = make_service({"b": "secret-b"}, "b")
+        with self.assertRaises(JWTError):
+            retired.decode(token)
+
+    def test_tokens_without_kid_need_the_legacy_key(self):
+        token = jwt.encode({"sub": "user@example.com", "exp": time.time() + 60}, "legacy", algorithm=ALGORITHM)
+        self.assertEqual(make_service({"a": "legacy"}, "a", legacy_key="legacy").decode(token)["sub"],
+                         "user@example.com")
+        with self.assertRaises(JWTError):
+            make_service({"b": "secret-b"}, "b").decode(token)
+
+    def test_non_string_kid_is_rejected(self):
+        token = jwt.encode({"sub": "x", "exp": time.time() + 60}, "secret-a", algorithm=ALGORITHM,
+                           headers={"kid": ["a"]})
+        with self.assertRaises(JWTError):
+            make_service({"a": "secret-a"}, "a").decode(token)
+
+    def test_refresh_token_is_not_an_access_token(self):
+        service = make_service({"a": "secret-a"}, "a")
+        refresh = service.create_refresh_token("user@example.com")
+        self.assertIn("jti", service.decode(refresh, token_type="refresh"))
+        with self.assertRaises(JWTError):
+            service.decode(refresh)
+
+
+class TestRefreshTokenRevocation(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine, tables=[RevokedToken.__table__])
+        self.db = sessionmaker(bind=engine)()
+        self.service = make_service({"a": "secret-a"}, "a")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_replayed_refresh_token_loses_the_revoke(self):
+        claims = self.service.decode(self.service.create_refresh_token("user@example.com"), token_type="refresh")
+        self.assertFalse(self.service.is_revoked(self.db, claims["jti"]))
+        self.assertTrue(self.service.revoke(self.db, claims))
+        self.assertFalse(self.service.revoke(self.db, claims))
+
+        # Another process learns about it from the table
+        other = make_service({"a": "secret-a"}, "a")
+        self.assertTrue(other.is_revoked(self.db, claims["jti"]))
+
+    def test_expired_revocations_are_purged(self):
+        now = datetime.now(timezone.utc)
+        self.db.add_all([
+            RevokedToken(jti="a" * 32, expires_at=now - timedelta(minutes=1)),
+            RevokedToken(jti="b" * 32, expires_at=now + timedelta(days=1)),
+        ])
+        self.db.commit()
+        self.assertEqual(self.service.purge_revoked(self.db), 1)
+        self.db.commit()
+        self.assertEqual([jti for (jti,) in self.db.query(RevokedToken.jti)], ["b" * 32])
+
+
+if __name__ == "__main__":
+    unittest.main()